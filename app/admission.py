@@ -0,0 +1,153 @@
+# app/admission.py
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Callable, Optional
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class AdmissionController:
+    """
+    Front door for model calls on a shared executor.
+
+    Counts calls that are queued or running. Once that count reaches
+    max_pending, new calls are shed (submit returns None) so the caller can
+    answer with a canned reply instead of waiting in the queue. Priority
+    calls may use priority_reserve extra slots on top of that.
+
+    Admitted calls wait in two queues here rather than in the executor's
+    FIFO: at most max_running calls are handed to the executor at once, and
+    a free slot always goes to the oldest priority call before any normal
+    one. max_running should match the executor's worker count; None hands
+    every call to the executor straight away (no reordering).
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        max_pending: int,
+        priority_reserve: int = 0,
+        wait_samples: int = 1000,
+        max_running: Optional[int] = None,
+    ):
+        self._executor = executor
+        self.max_pending = max_pending
+        self.priority_reserve = priority_reserve
+        self.max_running = max_running
+        self._lock = threading.Lock()
+        self._queues = {True: deque(), False: deque()}  # priority -> waiting calls
+        self._pending = 0
+        self._dispatched = 0
+        self._running = 0
+        self._admitted = 0
+        self._shed = 0
+        self._shed_priority = 0
+        self._queue_waits_ms = deque(maxlen=wait_samples)
+        self._priority_waits_ms = deque(maxlen=wait_samples)
+
+    def submit(self, fn: Callable, *args, priority: bool = False) -> Optional[Future]:
+        limit = self.max_pending + (self.priority_reserve if priority else 0)
+        with self._lock:
+            if self._pending >= limit:
+                self._shed += 1
+                if priority:
+                    self._shed_priority += 1
+                return None
+            self._pending += 1
+            self._admitted += 1
+            future = Future()
+            self._queues[priority].append((future, fn, args, priority, time.monotonic()))
+
+        future.add_done_callback(self._release)
+        self._pump()
+        return future
+
+    def _release(self, _future: Future):
+        with self._lock:
+            self._pending -= 1
+
+    def _pump(self):
+        # hand queued calls to the executor while there are free slots, priority first
+        while True:
+            with self._lock:
+                if self.max_running is not None and self._dispatched >= self.max_running:
+                    return
+                queue = self._queues[True] or self._queues[False]
+                if not queue:
+                    return
+                item = queue.popleft()
+                if item[0].cancelled():
+                    continue
+                self._dispatched += 1
+            try:
+                self._executor.submit(self._run, *item)
+            except Exception as error:
+                with self._lock:
+                    self._dispatched -= 1
+                if item[0].set_running_or_notify_cancel():
+                    item[0].set_exception(error)
+
+    def _run(self, future: Future, fn: Callable, args: tuple, priority: bool, submitted_at: float):
+        try:
+            # callers cancel futures they stopped waiting for; skip those
+            if not future.set_running_or_notify_cancel():
+                return
+            waited_ms = (time.monotonic() - submitted_at) * 1000.0
+            with self._lock:
+                self._running += 1
+                self._queue_waits_ms.append(waited_ms)
+                if priority:
+                    self._priority_waits_ms.append(waited_ms)
+            try:
+                future.set_result(fn(*args))
+            except BaseException as error:
+                future.set_exception(error)
+            finally:
+                with self._lock:
+                    self._running -= 1
+        finally:
+            with self._lock:
+                self._dispatched -= 1
+            self._pump()
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._queue_waits_ms)
+            priority_waits = sorted(self._priority_waits_ms)
+            pending = self._pending
+            running = self._running
+            admitted = self._admitted
+            shed = self._shed
+            shed_priority = self._shed_priority
+
+        return {
+            "maxPending": self.max_pending,
+            "priorityReserve": self.priority_reserve,
+            "maxRunning": self.max_running,
+            "inFlight": running,
+            "queued": max(0, pending - running),
+            "admitted": admitted,
+            "shed": shed,
+            "shedPriority": shed_priority,
+            "queueWaitMs": {
+                "samples": len(waits),
+                "p50": round(_percentile(waits, 50), 2),
+                "p90": round(_percentile(waits, 90), 2),
+                "p99": round(_percentile(waits, 99), 2),
+                "max": round(waits[-1], 2) if waits else 0.0,
+            },
+            "priorityQueueWaitMs": {
+                "samples": len(priority_waits),
+                "p50": round(_percentile(priority_waits, 50), 2),
+                "p99": round(_percentile(priority_waits, 99), 2),
+                "max": round(priority_waits[-1], 2) if priority_waits else 0.0,
+            },
+        }
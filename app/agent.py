@@ -39,13 +39,15 @@
 #         return response.text.strip()
 #     except Exception as e:
 #         print("Gemini error:", e)
-#         return "Please give me a moment, I am checking this."
+#         return REPLY_MODEL_ERROR
 
 
 
 # app/agent.py
 
+from app.fallbacks import REPLY_MODEL_ERROR
 from app.gemini_client import get_model
+from app.ingest import prompt_text
 
 
 AGENT_PERSONA = """
@@ -77,7 +79,7 @@ def generate_agent_reply(history):
 
     conversation = ""
     for msg in history:
-        conversation += f"{msg['sender']}: {msg['text']}\n"
+        conversation += f"{msg['sender']}: {prompt_text(msg)}\n"
 
     prompt = f"""
 {AGENT_PERSONA}
@@ -93,5 +95,5 @@ Reply as the user.
         return response.text.strip()
     except Exception as e:
         print("Gemini error:", e)
-        return "Please give me a moment, I am checking this."
+        return REPLY_MODEL_ERROR
 
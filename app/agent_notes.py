@@ -1,4 +1,5 @@
 from app.gemini_client import get_model
+from app.ingest import prompt_text
 
 
 SUMMARY_PROMPT = """
@@ -49,7 +50,7 @@ def generate_agent_notes(history: list) -> str:
     conversation = ""
     for msg in history:
         sender = msg.get("sender", "unknown")
-        text = msg.get("text", "")
+        text = prompt_text(msg)
         conversation += f"{sender}: {text}\n"
 
     prompt = f"""
@@ -0,0 +1,43 @@
+# app/codec.py
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+if orjson is not None:
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    _ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj: Any) -> bytes:
+        return _ENCODER.encode(obj).encode("utf-8")
+
+    def loads(data):
+        return json.loads(data)
+
+
+# Fields of the extractedIntelligence block, in callback order
+INTELLIGENCE_FIELDS = (
+    "bankAccounts",
+    "upiIds",
+    "phishingLinks",
+    "phoneNumbers",
+    "emailAddresses",
+    "ifscCodes",
+    "panNumbers",
+)
+INTELLIGENCE_FIELDS_WITH_KEYWORDS = INTELLIGENCE_FIELDS + ("suspiciousKeywords",)
+
+
+def intelligence_block(extracted_intelligence: dict, include_keywords: bool = False) -> dict:
+    fields = INTELLIGENCE_FIELDS_WITH_KEYWORDS if include_keywords else INTELLIGENCE_FIELDS
+    return {field: extracted_intelligence.get(field, []) for field in fields}
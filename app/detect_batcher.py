@@ -0,0 +1,114 @@
+# app/detect_batcher.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class DetectionBatcher:
+    """
+    Collects detection requests for up to max_wait_ms (or max_batch
+    messages), classifies them with one batch_fn call and fans the
+    verdicts back out to the waiting futures.
+
+    dispatch(fn, texts) must return a Future for fn(texts), or None when
+    the call is refused (e.g. shed by admission control).
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list], list],
+        max_batch: int = 8,
+        max_wait_ms: float = 5.0,
+        dispatch: Optional[Callable] = None,
+    ):
+        self._batch_fn = batch_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        if dispatch is None:
+            dispatch = ThreadPoolExecutor(max_workers=4).submit
+        self._dispatch = dispatch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.refused = 0
+
+    def submit(self, text: str) -> Future:
+        future = Future()
+        self._ensure_started()
+        self._queue.put((text, future))
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="detect-batcher", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch: list):
+        # callers that already timed out and cancelled are dropped here
+        live = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += len(live)
+
+        texts = [text for text, _ in live]
+        try:
+            call = self._dispatch(self._batch_fn, texts)
+        except Exception:
+            call = None
+
+        if call is None:
+            with self._stats_lock:
+                self.refused += 1
+            for _, future in live:
+                future.set_result({"scamDetected": False, "shed": True, "reason": "Model request shed"})
+            return
+
+        def _fan_out(done: Future):
+            try:
+                verdicts = done.result()
+            except Exception:
+                verdicts = []
+            for index, (_, future) in enumerate(live):
+                if index < len(verdicts) and isinstance(verdicts[index], dict):
+                    future.set_result(verdicts[index])
+                else:
+                    future.set_result({"scamDetected": False, "reason": "Model request failed"})
+
+        call.add_done_callback(_fan_out)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "maxBatch": self.max_batch,
+                "maxWaitMs": round(self.max_wait * 1000.0, 2),
+                "batches": self.batches,
+                "requests": self.requests,
+                "refused": self.refused,
+                "avgBatchSize": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            }
@@ -39,10 +39,31 @@
 
 # app/detector.py
 import json
+import os
 import re
 from textwrap import dedent
 from app.gemini_client import get_model
 
+# Verdicts below this model confidence are downgraded to "not a scam"
+CONFIDENCE_THRESHOLD = float(os.getenv("DETECT_CONFIDENCE_THRESHOLD", "0.6"))
+
+
+def _verdict_from_parsed(parsed: dict) -> dict:
+    scam_detected = bool(parsed.get("scamDetected", False))
+    confidence = parsed.get("confidence", 0.0)
+    try:
+        confidence = float(confidence)
+    except (TypeError, ValueError):
+        confidence = 0.0
+
+    if scam_detected and confidence < CONFIDENCE_THRESHOLD:
+        scam_detected = False
+    reason = parsed.get("reason", "No reason provided")
+    return {
+        "scamDetected": scam_detected,
+        "reason": reason,
+    }
+
 
 def detect_scam(text: str):
     """
@@ -95,17 +116,79 @@ def detect_scam(text: str):
             "reason": "Unable to parse model response",
         }
 
-    scam_detected = bool(parsed.get("scamDetected", False))
-    confidence = parsed.get("confidence", 0.0)
-    try:
-        confidence = float(confidence)
-    except (TypeError, ValueError):
-        confidence = 0.0
+    return _verdict_from_parsed(parsed)
 
-    if scam_detected and confidence < 0.6:
-        scam_detected = False
-    reason = parsed.get("reason", "No reason provided")
-    return {
-        "scamDetected": scam_detected,
-        "reason": reason,
+
+def detect_scam_batch(texts: list) -> list:
+    """
+    Classify several messages with a single Gemini call.
+    Returns one verdict per input, in order, with the same threshold and
+    fallbacks as detect_scam.
+    """
+    if not texts:
+        return []
+    if len(texts) == 1:
+        return [detect_scam(texts[0])]
+
+    model = get_model()
+
+    numbered = "\n".join(
+        f"[{index}] {json.dumps(text, ensure_ascii=False)}"
+        for index, text in enumerate(texts)
+    )
+    prompt = dedent(
+        """
+        You are a scam detection classifier. Be conservative: only mark true when a
+        message has explicit scam indicators. Examples include urgency or threats,
+        credential/OTP requests, payment instructions (UPI IDs or account details),
+        phishing links/URLs, impersonation of banks/government/brands, or fake rewards.
+        If a message is normal or you are unsure, return false.
+        Classify each numbered message independently.
+
+        Messages:
+        {numbered}
+
+        Respond ONLY with a JSON array containing one object per message:
+        [
+          {{"index": 0, "scamDetected": true or false, "confidence": 0.0-1.0, "reason": "short explanation"}}
+        ]
+        """
+    ).strip().format(numbered=numbered)
+
+    try:
+        response = model.generate_content(prompt)
+    except Exception:
+        return [
+            {"scamDetected": False, "reason": "Model request failed"}
+            for _ in texts
+        ]
+
+    unparsed = {
+        "scamDetected": False,
+        "reason": "Unable to parse model response",
     }
+
+    text_resp = getattr(response, "text", "") or ""
+    json_match = re.search(r"\[.*\]", text_resp, re.DOTALL)
+    if not json_match:
+        return [dict(unparsed) for _ in texts]
+
+    try:
+        parsed = json.loads(json_match.group(0))
+    except json.JSONDecodeError:
+        return [dict(unparsed) for _ in texts]
+    if not isinstance(parsed, list):
+        return [dict(unparsed) for _ in texts]
+
+    by_index = {}
+    for position, item in enumerate(parsed):
+        if not isinstance(item, dict):
+            continue
+        index = item.get("index", position)
+        if isinstance(index, int) and 0 <= index < len(texts):
+            by_index.setdefault(index, item)
+
+    return [
+        _verdict_from_parsed(by_index[index]) if index in by_index else dict(unparsed)
+        for index in range(len(texts))
+    ]
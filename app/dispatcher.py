@@ -0,0 +1,293 @@
+# app/dispatcher.py
+#
+# Multi-process mode: a front dispatcher that consistent-hashes sessionId /
+# scenarioId to N worker processes, each running app.main with its own
+# in-memory shard of sessions.
+#
+#   SHARD_WORKERS=4 python -m app.dispatcher
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import requests
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from app.ingest import MAX_BODY_BYTES
+from app.codec import loads
+from app.payloads import parse_turn_request, read_body
+from app.sharding import ShardRouter, ShardStats
+
+load_dotenv()
+
+API_KEY = os.getenv("API_KEY")
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", str(os.cpu_count() or 1)))
+SHARD_HOST = "127.0.0.1"
+SHARD_BASE_PORT = int(os.getenv("SHARD_BASE_PORT", "9100"))
+SHARD_PROXY_TIMEOUT = float(os.getenv("SHARD_PROXY_TIMEOUT_SECONDS", "70"))
+SHARD_HEALTH_TIMEOUT = float(os.getenv("SHARD_HEALTH_TIMEOUT_SECONDS", "30"))
+# open connections per shard; proxied turns are async, so this (not a thread pool) bounds concurrency
+SHARD_MAX_CONNECTIONS = int(os.getenv("SHARD_MAX_CONNECTIONS", "256"))
+# idle connections kept per shard; a large idle pool measured slower than reconnecting
+SHARD_KEEPALIVE_CONNECTIONS = int(os.getenv("SHARD_KEEPALIVE_CONNECTIONS", "32"))
+SHARD_STOP_TIMEOUT = float(os.getenv("SHARD_STOP_TIMEOUT_SECONDS", "20"))
+SESSION_SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT_PATH", "")
+
+_FORWARDED_HEADERS = ("x-api-key", "content-type")
+
+
+class ShardSupervisor:
+    """
+    Starts one app.main worker process per shard, restarts workers that
+    exit, and keeps the router's live ring in sync with worker health.
+    """
+
+    def __init__(self, count: int, base_port: int):
+        self.router = ShardRouter(range(count))
+        self.stats = [ShardStats(shard, base_port + shard) for shard in range(count)]
+        self._procs = [None] * count
+        self._sessions = [requests.Session() for _ in range(count)]  # health checks (monitor threads)
+        self._clients = []  # proxying, one async client per shard
+        self._stopping = threading.Event()
+        self._monitor = None
+        self._recovering = set()
+        self._recovery_lock = threading.Lock()
+        self._spawn_lock = threading.Lock()
+
+    def url(self, shard: int, path: str) -> str:
+        return f"http://{SHARD_HOST}:{self.stats[shard].port}{path}"
+
+    def _spawn(self, shard: int):
+        env = os.environ.copy()
+        env["SHARD_INDEX"] = str(shard)
+        if SESSION_SNAPSHOT_PATH:
+            # each shard snapshots and restores only its own sessions
+            env["SESSION_SNAPSHOT_PATH"] = f"{SESSION_SNAPSHOT_PATH}.shard{shard}"
+        with self._spawn_lock:
+            if self._stopping.is_set():
+                return
+            proc = subprocess.Popen(
+                [
+                    sys.executable, "-m", "uvicorn", "app.main:app",
+                    "--host", SHARD_HOST, "--port", str(self.stats[shard].port),
+                ],
+                env=env,
+            )
+            self._procs[shard] = proc
+            self.stats[shard].pid = proc.pid
+
+    def _wait_healthy(self, shard: int) -> bool:
+        deadline = time.monotonic() + SHARD_HEALTH_TIMEOUT
+        while time.monotonic() < deadline and not self._stopping.is_set():
+            proc = self._procs[shard]
+            if proc is None or proc.poll() is not None:
+                return False
+            try:
+                if self._sessions[shard].get(self.url(shard, "/"), timeout=1).status_code == 200:
+                    return True
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        return False
+
+    def _bring_up(self, shard: int):
+        self._spawn(shard)
+        if self._wait_healthy(shard):
+            self.stats[shard].up = True
+            self.router.mark_up(shard)
+        else:
+            print(f"[DISPATCHER] shard {shard} failed health check")
+
+    def start(self):
+        for shard in range(len(self.stats)):
+            self._spawn(shard)
+        for shard in range(len(self.stats)):
+            if self._wait_healthy(shard):
+                self.stats[shard].up = True
+                self.router.mark_up(shard)
+        self._monitor = threading.Thread(target=self._watch, name="shard-monitor", daemon=True)
+        self._monitor.start()
+
+    def _watch(self):
+        # only non-blocking checks here; each restart/health wait runs on its own thread
+        while not self._stopping.wait(1.0):
+            for shard, proc in enumerate(self._procs):
+                if self._stopping.is_set():
+                    return
+                if proc is not None and proc.poll() is None and self.stats[shard].up:
+                    continue
+                with self._recovery_lock:
+                    if shard in self._recovering:
+                        continue
+                    self._recovering.add(shard)
+                threading.Thread(
+                    target=self._recover, args=(shard,), name=f"shard-recover-{shard}", daemon=True
+                ).start()
+
+    def _recover(self, shard: int):
+        try:
+            proc = self._procs[shard]
+            # worker exited (or never became healthy): take it off the ring and restart it
+            self.stats[shard].up = False
+            self.router.mark_down(shard)
+            if proc is not None and proc.poll() is not None:
+                print(f"[DISPATCHER] shard {shard} exited with {proc.returncode}, restarting")
+                self.stats[shard].restarts += 1
+                self._bring_up(shard)
+            elif proc is not None and self._wait_healthy(shard):
+                self.stats[shard].up = True
+                self.router.mark_up(shard)
+        finally:
+            with self._recovery_lock:
+                self._recovering.discard(shard)
+
+    def stop(self):
+        self._stopping.set()
+        # SIGTERM lets each worker run its shutdown hook (session snapshot);
+        # the spawn lock keeps a concurrent restart from starting a new worker now
+        with self._spawn_lock:
+            for proc in self._procs:
+                if proc is not None and proc.poll() is None:
+                    proc.terminate()
+        for proc in self._procs:
+            if proc is None:
+                continue
+            try:
+                # room for the worker to drain post-turn work and write its snapshot
+                proc.wait(timeout=SHARD_STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    def open_clients(self):
+        limits = httpx.Limits(
+            max_connections=SHARD_MAX_CONNECTIONS, max_keepalive_connections=SHARD_KEEPALIVE_CONNECTIONS
+        )
+        self._clients = [
+            httpx.AsyncClient(timeout=SHARD_PROXY_TIMEOUT, limits=limits) for _ in self.stats
+        ]
+
+    async def close_clients(self):
+        for client in self._clients:
+            await client.aclose()
+
+    async def forward(self, shard: int, method: str, path: str, body: bytes, headers: dict) -> httpx.Response:
+        stats = self.stats[shard]
+        started_at = stats.begin()
+        ok = False
+        try:
+            response = await self._clients[shard].request(
+                method, self.url(shard, path), content=body, headers=headers
+            )
+            ok = response.status_code < 500
+            return response
+        finally:
+            stats.end(started_at, ok)
+
+    def shard_stats(self) -> list:
+        pinned = self.router.pinned_counts()
+        rows = []
+        for stats in self.stats:
+            row = stats.snapshot()
+            row["pinnedSessions"] = pinned.get(stats.shard, 0)
+            rows.append(row)
+        return rows
+
+
+app = FastAPI()
+_SUPERVISOR = ShardSupervisor(SHARD_WORKERS, SHARD_BASE_PORT)
+
+
+@app.on_event("startup")
+async def start_shards():
+    _SUPERVISOR.open_clients()
+    # worker start-up blocks on health checks, keep it off the event loop
+    await run_in_threadpool(_SUPERVISOR.start)
+
+
+@app.on_event("shutdown")
+async def stop_shards():
+    await _SUPERVISOR.close_clients()
+    await run_in_threadpool(_SUPERVISOR.stop)
+
+
+def _session_key(body: bytes) -> str:
+    try:
+        payload = loads(body) if body.strip() else None
+    except ValueError:
+        return ""
+    session_id = parse_turn_request(payload).session_id
+    return "" if session_id is None else str(session_id)
+
+
+async def _proxy(method: str, path: str, key: str, body: bytes, headers: dict) -> Response:
+    tried = []
+    # one retry on another live shard if the owner is unreachable
+    for _ in range(2):
+        shard = _SUPERVISOR.router.route(key, exclude=tried)
+        if shard is None:
+            break
+        try:
+            upstream = await _SUPERVISOR.forward(shard, method, path, body, headers)
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            # connect refused / timed out: the shard never saw the request, so it is safe to replay
+            tried.append(shard)
+            continue
+        except httpx.TimeoutException:
+            raise HTTPException(status_code=504, detail="Shard timed out")
+        except httpx.TransportError:
+            # reset mid-request: the turn may already have run on that shard
+            raise HTTPException(status_code=502, detail="Shard connection lost")
+        return Response(
+            content=upstream.content,
+            status_code=upstream.status_code,
+            media_type=upstream.headers.get("content-type", "application/json"),
+        )
+    raise HTTPException(status_code=503, detail="No shard available")
+
+
+def _forward_headers(request: Request) -> dict:
+    return {name: request.headers[name] for name in _FORWARDED_HEADERS if name in request.headers}
+
+
+@app.get("/")
+def health_check():
+    return {"status": "ok"}
+
+
+@app.get("/shards")
+def shards(x_api_key: str = Header(None)):
+    if x_api_key != API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    return {
+        "status": "success",
+        "liveShards": sorted(_SUPERVISOR.router.live.nodes),
+        "shards": _SUPERVISOR.shard_stats(),
+    }
+
+
+@app.api_route("/honeypot", methods=["GET", "POST"])
+async def honeypot(request: Request):
+    body = await read_body(request, MAX_BODY_BYTES)
+    key = _session_key(body) if request.method == "POST" else ""
+    return await _proxy(request.method, "/honeypot", key, body, _forward_headers(request))
+
+
+@app.get("/honeypot/stats")
+async def honeypot_stats(request: Request, shard: int = 0):
+    if shard not in _SUPERVISOR.router.live.nodes:
+        raise HTTPException(status_code=404, detail="Shard not live")
+    try:
+        upstream = await _SUPERVISOR.forward(shard, "GET", "/honeypot/stats", b"", _forward_headers(request))
+    except httpx.TransportError:
+        raise HTTPException(status_code=502, detail="Shard unreachable")
+    return Response(content=upstream.content, status_code=upstream.status_code, media_type="application/json")
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", "8000")))
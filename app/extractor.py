@@ -81,26 +81,66 @@ SUSPICIOUS_KEYWORDS = {
  }
  
  
+# Regex scanning runs over CHUNK_SIZE windows that overlap by CHUNK_OVERLAP.
+# Every pattern below has a bounded match length no larger than the overlap,
+# so an artifact straddling a window edge is always seen whole by one window,
+# and per-window work is bounded, keeping extraction linear in input size.
+CHUNK_SIZE = 8192
+CHUNK_OVERLAP = 1100
+
+UPI_PATTERN = re.compile(r"\b[\w.-]{1,64}@[\w.-]{1,64}\b")
+PHONE_PATTERN = re.compile(r"(?:\+91|91|0)?[-\s.]?[6-9]\d{9}(?!\d)")
+URL_PATTERN = re.compile(r"https?://[^\s]{1,1024}")
+EMAIL_PATTERN = re.compile(
+    r"\b[a-zA-Z0-9._%+-]{1,64}@[a-zA-Z0-9.-]{1,253}\.com\b"
+)
+IFSC_PATTERN = re.compile(r"\b[A-Z]{4}0[A-Z0-9]{6}\b")
+PAN_PATTERN = re.compile(r"\b[A-Z]{5}\d{4}[A-Z]\b")
+ACCOUNT_PATTERN = re.compile(
+    r"\b(?:account(?: number)?|acct|acc(?:ount)?|a/c)\s{0,8}[:\-]?\s{0,8}(\d{6,18})\b",
+    flags=re.IGNORECASE
+)
+
+
+def chunked_findall(pattern, text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> list:
+    """
+    Same result as pattern.findall(text) for patterns whose matches are at
+    most `overlap` chars long, but scanning text one window at a time.
+    """
+    if len(text) <= chunk_size + overlap:
+        return pattern.findall(text)
+
+    results = []
+    position = 0  # where the next search may start (end of last accepted match)
+    window_start = 0
+    text_len = len(text)
+    while window_start < text_len:
+        owned_end = min(text_len, window_start + chunk_size)
+        window_end = min(text_len, owned_end + overlap)
+        # matches must start in [window_start, owned_end); they end before window_end.
+        # finditer with pos (unlike slicing) still sees the chars before pos for \b
+        for match in pattern.finditer(text, max(position, window_start), window_end):
+            if match.start() >= owned_end:
+                break
+            results.append(match.group(1) if pattern.groups else match.group(0))
+            position = match.end()
+        window_start = owned_end
+    return results
+
+
 def extract_intelligence(messages):
      text = " ".join([m["text"] for m in messages])
      lowered = text.lower()
-     upi_matches = re.findall(r"\b[\w.-]+@[\w.-]+\b", text)
-     phone_numbers = re.findall(r"(?:\+91|91|0)?[-\s.]?[6-9]\d{9}(?!\d)", text)
-     urls = re.findall(r"https?://[^\s]+", text)
-     email_pattern = re.compile(
-        r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.com\b"
-     )
-     emails = email_pattern.findall(text)
-     ifsc_codes = re.findall(r"\b[A-Z]{4}0[A-Z0-9]{6}\b", text)
-     pan_numbers = re.findall(r"\b[A-Z]{5}\d{4}[A-Z]\b", text)
-     labeled_accounts = re.findall(
-        r"\b(?:account(?: number)?|acct|acc(?:ount)?|a/c)\s*[:\-]?\s*(\d{6,18})\b",
-        text,
-        flags=re.IGNORECASE
-    )
+     upi_matches = chunked_findall(UPI_PATTERN, text)
+     phone_numbers = chunked_findall(PHONE_PATTERN, text)
+     urls = chunked_findall(URL_PATTERN, text)
+     emails = chunked_findall(EMAIL_PATTERN, text)
+     ifsc_codes = chunked_findall(IFSC_PATTERN, text)
+     pan_numbers = chunked_findall(PAN_PATTERN, text)
+     labeled_accounts = chunked_findall(ACCOUNT_PATTERN, text)
      bank_accounts = set(labeled_accounts)
      upi_ids = [
-        upi for upi in upi_matches if not email_pattern.fullmatch(upi)
+        upi for upi in upi_matches if not EMAIL_PATTERN.fullmatch(upi)
     ]
 
      suspicious_keywords = sorted(
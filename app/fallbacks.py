@@ -0,0 +1,10 @@
+# app/fallbacks.py
+
+# Canned agent replies used when the model is shed, times out or fails.
+# The reply cache refuses to store any of these.
+REPLY_MODEL_ERROR = "Please give me a moment, I am checking this."
+REPLY_SHED = "I am checking this. Please share official number and where to verify."
+REPLY_EMPTY = "Please share your official helpline number and payment details again."
+REPLY_ERROR = "Please share your official helpline number and where to verify this."
+
+FALLBACK_REPLIES = frozenset({REPLY_MODEL_ERROR, REPLY_SHED, REPLY_EMPTY, REPLY_ERROR})
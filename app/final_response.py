@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from app.codec import intelligence_block
+
 
 def build_final_api_response(
     scam_detected: bool,
@@ -35,16 +37,7 @@ def build_final_api_response(
             "engagementDurationSeconds": engagement_duration,
             "totalMessagesExchanged": total_messages
         },
-        "extractedIntelligence": {
-            "bankAccounts": extracted_intelligence.get("bankAccounts", []),
-            "upiIds": extracted_intelligence.get("upiIds", []),
-            "phishingLinks": extracted_intelligence.get("phishingLinks", []),
-            "phoneNumbers": extracted_intelligence.get("phoneNumbers", []),
-            "emailAddresses": extracted_intelligence.get("emailAddresses", []),
-            "ifscCodes": extracted_intelligence.get("ifscCodes", []),
-            "panNumbers": extracted_intelligence.get("panNumbers", [])
-            # "suspiciousKeywords": extracted_intelligence.get("suspiciousKeywords", [])
-        },
+        "extractedIntelligence": intelligence_block(extracted_intelligence),
         "agentNotes": agent_notes
     }
 
@@ -1,6 +1,8 @@
 import threading
 import requests
 
+from app.codec import dumps, intelligence_block
+
 GUVI_CALLBACK_URL = "https://hackathon.guvi.in/api/updateHoneyPotFinalResult"
 _SESSION = requests.Session()
 
@@ -22,16 +24,7 @@ def send_final_result_to_guvi(
         "scamDetected": scam_detected,
         "totalMessagesExchanged": total_messages,
         "engagementDurationSeconds": engagement_duration_seconds,
-        "extractedIntelligence": {
-            "bankAccounts": extracted_intelligence.get("bankAccounts", []),
-            "upiIds": extracted_intelligence.get("upiIds", []),
-            "phishingLinks": extracted_intelligence.get("phishingLinks", []),
-            "phoneNumbers": extracted_intelligence.get("phoneNumbers", []),
-            "emailAddresses": extracted_intelligence.get("emailAddresses", []),
-            "ifscCodes": extracted_intelligence.get("ifscCodes", []),
-            "panNumbers": extracted_intelligence.get("panNumbers", []),
-            "suspiciousKeywords": extracted_intelligence.get("suspiciousKeywords", []),
-        },
+        "extractedIntelligence": intelligence_block(extracted_intelligence, include_keywords=True),
         "agentNotes": agent_notes,
     }
     print("========== GUVI FINAL CALLBACK PAYLOAD ==========")
@@ -41,7 +34,8 @@ def send_final_result_to_guvi(
     try:
         response = _SESSION.post(
             GUVI_CALLBACK_URL,
-            json=payload,
+            data=dumps(payload),
+            headers={"Content-Type": "application/json"},
             timeout=5,
         )
         print(f"[GUVI CALLBACK] status check={response.status_code}")
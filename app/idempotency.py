@@ -0,0 +1,100 @@
+# app/idempotency.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Tuple
+
+
+def make_turn_key(session_id: str, message: str, client_timestamp: Any = None) -> Tuple[str, str, str]:
+    """
+    Idempotency key for one scammer turn: (session, message hash, client timestamp).
+    """
+    digest = hashlib.sha256((message or "").encode("utf-8")).hexdigest()
+    ts = "" if client_timestamp is None else str(client_timestamp)
+    return str(session_id), digest, ts
+
+
+class TurnCache:
+    """
+    Remembers the response produced for a turn so retries of the same
+    POST get it back instantly, and coalesces concurrent duplicates that
+    are still in flight onto the same future.
+    """
+
+    def __init__(self, ttl_seconds: float = 600.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._done = OrderedDict()  # key -> (expires_at, response)
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def _get_done(self, key) -> Optional[Any]:
+        entry = self._done.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._done[key]
+            return None
+        self._done.move_to_end(key)
+        return response
+
+    def _store_done(self, key, response):
+        self._done[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._done.move_to_end(key)
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+
+    def run_once(self, key, fn: Callable[[], Any]) -> Any:
+        """
+        Returns the cached response for key, waits on an in-flight run of
+        the same key, or runs fn and caches its result.
+        Exceptions are propagated to every waiter and are not cached.
+        """
+        with self._lock:
+            cached = self._get_done(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            response = fn()
+        except BaseException as error:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(error)
+            raise
+
+        with self._lock:
+            self._store_done(key, response)
+            self._inflight.pop(key, None)
+        future.set_result(response)
+        return response
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._done),
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+            }
@@ -0,0 +1,36 @@
+# app/ingest.py
+
+import os
+from typing import Optional, Tuple
+
+# Hard cap on stored scammer text; anything beyond is dropped at ingestion
+MAX_MESSAGE_CHARS = int(os.getenv("MAX_MESSAGE_CHARS", "20000"))
+# Size of the view of a message that goes into model prompts
+PROMPT_MESSAGE_CHARS = int(os.getenv("PROMPT_MESSAGE_CHARS", "1500"))
+# Request bodies larger than this are rejected before they are decoded
+MAX_BODY_BYTES = int(os.getenv("MAX_BODY_BYTES", "262144"))
+
+_ELISION = " [...] "
+
+
+def ingest_message(text: str) -> Tuple[str, Optional[str]]:
+    """
+    Returns (raw text capped at MAX_MESSAGE_CHARS, prompt view).
+    The prompt view keeps the head and tail of long messages and is None
+    when the raw text is already short enough to prompt with.
+    """
+    raw = (text or "")[:MAX_MESSAGE_CHARS]
+    if len(raw) <= PROMPT_MESSAGE_CHARS:
+        return raw, None
+
+    keep = max(0, PROMPT_MESSAGE_CHARS - len(_ELISION))
+    head = keep * 2 // 3
+    tail = keep - head
+    return raw, raw[:head] + _ELISION + (raw[-tail:] if tail else "")
+
+
+def prompt_text(msg: dict) -> str:
+    """
+    Text of a stored message as it should appear in a model prompt.
+    """
+    return msg.get("prompt_text") or msg.get("text", "")
@@ -0,0 +1,64 @@
+# app/locks.py
+
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+
+
+class _SessionEntry:
+    __slots__ = ("lock", "holders")
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.holders = 0  # threads holding or waiting on `lock`
+
+
+class SessionLocks:
+    """
+    One re-entrant lock per active session, created on first use and
+    dropped once no thread holds or waits on it. A fixed array of stripe
+    locks only guards the lock tables, and each stripe is held just long
+    enough to look up or release an entry. Different sessions therefore
+    never wait on each other, even when they hash to the same stripe.
+    """
+
+    def __init__(self, stripes: int = 128):
+        stripes = max(1, stripes)
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._tables = [{} for _ in range(stripes)]
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self._tables)
+
+    def stripe_for(self, key: str) -> int:
+        # crc32 is stable across processes, unlike hash() on str
+        return zlib.crc32(str(key).encode("utf-8")) % len(self._stripes)
+
+    @contextmanager
+    def hold(self, key: str):
+        stripe = self.stripe_for(key)
+        table = self._tables[stripe]
+        with self._stripes[stripe]:
+            entry = table.get(key)
+            if entry is None:
+                entry = table[key] = _SessionEntry()
+            entry.holders += 1
+        try:
+            with entry.lock:
+                yield
+        finally:
+            with self._stripes[stripe]:
+                entry.holders -= 1
+                if entry.holders == 0:
+                    del table[key]
+
+
+SESSION_LOCKS = SessionLocks(int(os.getenv("SESSION_LOCK_STRIPES", "128")))
+
+
+def session_lock(session_id: str):
+    """
+    Context manager serializing work on one session.
+    """
+    return SESSION_LOCKS.hold(session_id)
@@ -1,22 +1,36 @@
 from datetime import datetime
 # import datetime
 
-from fastapi import FastAPI, Header, HTTPException, Body
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
 from app.agent_notes import generate_agent_notes
 import os
-from typing import Any, Optional, Tuple, Dict
+import threading
+import time
+from typing import Any, Optional
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 
 from app.memory import add_message, get_messages, get_message_count
 from app.memory import was_scam_detected, mark_scam_detected
-from app.detector import detect_scam
+from app.detector import detect_scam, detect_scam_batch
 from app.agent import generate_agent_reply
 from app.extractor import extract_intelligence
 
-from app.guvi_callback import send_final_result_to_guvi_async
-from app.memory import is_session_finalized, mark_session_finalized
+from app.guvi_callback import send_final_result_to_guvi, send_final_result_to_guvi_async
+from app.memory import is_session_finalized, try_finalize_session
+from app.memory import snapshot_sessions, restore_sessions
+from app.locks import session_lock
+from app.idempotency import TurnCache, make_turn_key
+from app.admission import AdmissionController
+from app.detect_batcher import DetectionBatcher
+from app.reply_cache import ReplyCache
+from app.fallbacks import REPLY_EMPTY, REPLY_ERROR, REPLY_SHED
+from app.post_turn import PostTurnPipeline
+from app.codec import dumps, loads
+from app.payloads import TURN_REQUEST_OPENAPI, parse_turn_request, read_body
+from app.ingest import MAX_BODY_BYTES, ingest_message, prompt_text
 
 load_dotenv()
 
@@ -31,7 +45,56 @@ DETECT_TIMEOUT = float(os.getenv("DETECT_TIMEOUT_SECONDS", "28"))
 REPLY_TIMEOUT = float(os.getenv("REPLY_TIMEOUT_SECONDS", "28"))
 
 # Reuse worker pool to avoid thread startup overhead each request
-_POOL = ThreadPoolExecutor(max_workers=8)
+_POOL_WORKERS = int(os.getenv("MODEL_POOL_WORKERS", "8"))
+_POOL = ThreadPoolExecutor(max_workers=_POOL_WORKERS)
+
+# Load shedding: past this many queued + running model calls, serve canned replies.
+# Sessions close to finalization may use PRIORITY_RESERVED_SLOTS extra slots and
+# take the next free pool worker ahead of queued normal calls.
+_ADMISSION = AdmissionController(
+    _POOL,
+    max_pending=int(os.getenv("MODEL_MAX_PENDING", str(_POOL_WORKERS + 4))),
+    priority_reserve=int(os.getenv("PRIORITY_RESERVED_SLOTS", "4")),
+    max_running=_POOL_WORKERS,
+)
+NEAR_FINAL_TURNS = int(os.getenv("NEAR_FINAL_TURNS", "4"))
+
+# Micro-batching of detection calls: DETECT_BATCH_MAX=1 disables it
+DETECT_BATCH_MAX = int(os.getenv("DETECT_BATCH_MAX", "8"))
+DETECT_BATCH_WAIT_MS = float(os.getenv("DETECT_BATCH_WAIT_MS", "5"))
+_DETECT_BATCHER = (
+    DetectionBatcher(
+        detect_scam_batch,
+        max_batch=DETECT_BATCH_MAX,
+        max_wait_ms=DETECT_BATCH_WAIT_MS,
+        dispatch=_ADMISSION.submit,
+    )
+    if DETECT_BATCH_MAX > 1
+    else None
+)
+
+# Near-duplicate reply reuse for templated scam scripts (max entries 0 disables it)
+_REPLY_CACHE = ReplyCache(
+    max_entries=int(os.getenv("REPLY_CACHE_MAX_ENTRIES", "5000")),
+    threshold=float(os.getenv("REPLY_CACHE_THRESHOLD", "0.85")),
+)
+
+# Post-turn stage: "async" moves extraction/finalization off the response path,
+# "inline" keeps it in the request like before
+POST_TURN_MODE = os.getenv("POST_TURN_MODE", "async").lower()
+# background notes + callback threads started by post-turn finalization
+_FINAL_RESULT_THREADS = set()
+_FINAL_RESULT_LOCK = threading.Lock()
+_POST_TURN = PostTurnPipeline(
+    lambda session_id, history: _finalize_if_complete(session_id, history, background_notes=True),
+    workers=int(os.getenv("POST_TURN_WORKERS", "2")),
+)
+
+# Retried turns (same session + message + client timestamp) reuse the first reply
+_TURN_CACHE = TurnCache(
+    ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600")),
+    max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")),
+)
 
 SCAM_HINTS = {
     "otp", "blocked", "suspended", "verify", "urgent", "immediately",
@@ -39,73 +102,33 @@ SCAM_HINTS = {
 }
 
 
-def _extract_single_payload(obj: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], dict]:
-    """
-    Supports:
-    1) Existing:
-       {"sessionId":"...","message":{"text":"..."},"metadata":{...}}
-    2) Panel:
-       {"scenarioId":"...","initialMessage":"...","metadata":{...}}
-    """
-    metadata = obj.get("metadata", {})
-    if not isinstance(metadata, dict):
-        metadata = {}
-
-    if "sessionId" in obj:
-        session_id = obj.get("sessionId")
-        msg = obj.get("message")
-        if isinstance(msg, dict):
-            message = msg.get("text")
-        elif isinstance(msg, str):
-            message = msg
-        else:
-            message = None
-        return session_id, message, metadata
-
-    if "scenarioId" in obj:
-        session_id = obj.get("scenarioId")
-        message = obj.get("initialMessage")
-        if isinstance(message, dict):
-            message = message.get("text")
-        return session_id, message, metadata
-
-    return None, None, metadata
-
-
-def _normalize_request_payload(payload: Any) -> Tuple[Optional[str], Optional[str], dict]:
-    # empty
-    if payload is None:
-        return None, None, {}
-
-    # panel may send list of scenarios -> pick first valid
-    if isinstance(payload, list):
-        for item in payload:
-            if isinstance(item, dict):
-                session_id, message, metadata = _extract_single_payload(item)
-                if session_id and message:
-                    return session_id, message, metadata
-        return None, None, {}
-
-    if isinstance(payload, dict):
-        return _extract_single_payload(payload)
-
-    return None, None, {}
-
-
 def _looks_like_scam_fast(text: str) -> bool:
     t = (text or "").lower()
     return any(k in t for k in SCAM_HINTS)
 
 
-def _detect_scam_fast(message: str) -> bool:
-    # fast pre-check first
+def _detect_scam_fast(message: str, priority: bool = False, prompt_view: Optional[str] = None) -> Optional[bool]:
+    """
+    True/False verdict, or None when the model call was shed under load
+    (the message is then left unclassified).
+    """
+    # fast pre-check first (full text; the model only sees the prompt view)
     if _looks_like_scam_fast(message):
         return True
+    model_text = prompt_view or message
 
     # bounded model call
-    future = _POOL.submit(detect_scam, message)
+    # near-final sessions skip batching so the call keeps its priority slot
+    if _DETECT_BATCHER is not None and not priority:
+        future = _DETECT_BATCHER.submit(model_text)
+    else:
+        future = _ADMISSION.submit(detect_scam, model_text, priority=priority)
+    if future is None:
+        return None
     try:
         result = future.result(timeout=DETECT_TIMEOUT)
+        if result.get("shed"):
+            return None
         return bool(result.get("scamDetected"))
     except FuturesTimeoutError:
         future.cancel()
@@ -115,21 +138,35 @@ def _detect_scam_fast(message: str) -> bool:
 
 
 
-def _generate_reply_fast(history: list) -> str:
-    future = _POOL.submit(generate_agent_reply, history)
+def _generate_reply_fast(history: list, priority: bool = False) -> str:
+    # history ends with the scammer turn being answered
+    scammer_text = prompt_text(history[-1]) if history else ""
+    previous_text = prompt_text(history[-2]) if len(history) > 1 else ""
+    already_sent = {msg["text"] for msg in history if msg.get("sender") == "agent"}
+    cached = _REPLY_CACHE.lookup(scammer_text, previous_text, exclude=already_sent)
+    if cached:
+        return cached
+
+    future = _ADMISSION.submit(generate_agent_reply, history, priority=priority)
+    if future is None:
+        return REPLY_SHED
     try:
         out = future.result(timeout=REPLY_TIMEOUT)
         if isinstance(out, str) and out.strip():
+            _REPLY_CACHE.store(scammer_text, previous_text, out)
             return out.strip()
-        return "Please share your official helpline number and payment details again."
+        return REPLY_EMPTY
     except FuturesTimeoutError:
         future.cancel()
-        return "I am checking this. Please share official number and where to verify."
+        return REPLY_SHED
     except Exception:
-        return "Please share your official helpline number and where to verify this."
+        return REPLY_ERROR
 
 def _generate_notes_fast(history: list) -> str:
-    future = _POOL.submit(generate_agent_notes, history)
+    # notes are only generated at finalization, so they always get priority
+    future = _ADMISSION.submit(generate_agent_notes, history, priority=True)
+    if future is None:
+        return "Scammer used social-engineering and payment redirection tactics."
     try:
         out = future.result(timeout=4)  # keep short
         if isinstance(out, str) and out.strip():
@@ -139,6 +176,10 @@ def _generate_notes_fast(history: list) -> str:
         return "Scammer used social-engineering and payment redirection tactics."
 
 
+def _is_near_finalization(session_id: str) -> bool:
+    return get_message_count(session_id) >= FALLBACK_MIN_TURNS - NEAR_FINAL_TURNS
+
+
 def _calculate_intel_score(extracted_intelligence: dict) -> int:
     """
     Weighted score for extracted intelligence.
@@ -157,6 +198,34 @@ def _calculate_intel_score(extracted_intelligence: dict) -> int:
     score += 1 * len(extracted_intelligence.get("panNumbers", []))
     return score
 
+def _is_engagement_complete(
+    extracted_intelligence: dict,
+    turns: int,
+    min_intel_score: Optional[int] = None,
+    fallback_min_turns: Optional[int] = None,
+) -> bool:
+    """
+    Hybrid finalization rule for a detected scam session: some non-keyword
+    evidence, plus either enough weighted intel or enough turns.
+    """
+    if min_intel_score is None:
+        min_intel_score = MIN_INTEL_SCORE
+    if fallback_min_turns is None:
+        fallback_min_turns = FALLBACK_MIN_TURNS
+    if not extracted_intelligence:
+        return False
+
+    has_non_keyword_evidence = any(
+        value
+        for key, value in extracted_intelligence.items()
+        if key != "suspiciousKeywords"
+    )
+    intel_score = _calculate_intel_score(extracted_intelligence)
+    return has_non_keyword_evidence and (
+        intel_score >= min_intel_score
+        or turns >= fallback_min_turns
+    )
+
 def _calculate_engagement_duration_seconds(history: list) -> int:
     """
     Calculates duration between earliest and latest message timestamp in seconds.
@@ -180,6 +249,37 @@ def _calculate_engagement_duration_seconds(history: list) -> int:
 
     return max(0, int((max(parsed) - min(parsed)).total_seconds()))
 
+# Session snapshot written on shutdown (SIGTERM) and lazily restored on startup
+SESSION_SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT_PATH", "")
+# How long shutdown waits for queued post-turn work before snapshotting
+POST_TURN_DRAIN_SECONDS = float(os.getenv("POST_TURN_DRAIN_SECONDS", "8"))
+
+
+@app.on_event("startup")
+def restore_session_snapshot():
+    if not SESSION_SNAPSHOT_PATH or not os.path.exists(SESSION_SNAPSHOT_PATH):
+        return
+    try:
+        restored = restore_sessions(SESSION_SNAPSHOT_PATH)
+        print(f"[SNAPSHOT] restored index of {restored} sessions")
+    except Exception as error:
+        print("Session snapshot restore failed:", str(error))
+
+
+@app.on_event("shutdown")
+def write_session_snapshot():
+    # finish pending finalizations first so they are sent and snapshotted as finalized
+    if not _drain_post_turn(POST_TURN_DRAIN_SECONDS):
+        print(f"[SNAPSHOT] post-turn work still pending after {POST_TURN_DRAIN_SECONDS}s")
+    if not SESSION_SNAPSHOT_PATH:
+        return
+    try:
+        result = snapshot_sessions(SESSION_SNAPSHOT_PATH)
+        print(f"[SNAPSHOT] wrote {result['sessions']} sessions ({result['bytes']} bytes)")
+    except Exception as error:
+        print("Session snapshot write failed:", str(error))
+
+
 @app.get("/")
 def health_check():
     return {"status": "ok"}
@@ -192,95 +292,161 @@ def honeypot_get(x_api_key: str = Header(None)):
     return {"status": "success", "message": "Honeypot endpoint reachable"}
 
 
-@app.post("/honeypot")
-def honeypot(payload: Optional[Any] = Body(None), x_api_key: str = Header(None)):
+@app.get("/honeypot/stats")
+def honeypot_stats(x_api_key: str = Header(None)):
+    if x_api_key != API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    return {
+        "status": "success",
+        "admission": _ADMISSION.stats(),
+        "idempotency": _TURN_CACHE.stats(),
+        "detectBatching": _DETECT_BATCHER.stats() if _DETECT_BATCHER is not None else None,
+        "replyCache": _REPLY_CACHE.stats(),
+        "postTurn": _POST_TURN.stats(),
+    }
+
+
+@app.post("/honeypot", openapi_extra=TURN_REQUEST_OPENAPI)
+async def honeypot(request: Request, x_api_key: str = Header(None)):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Invalid API key")
 
+    # raw body -> fast JSON decode + typed parse, skipping FastAPI's generic Any handling
+    body = await read_body(request, MAX_BODY_BYTES)
+    try:
+        payload = loads(body) if body.strip() else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid JSON body")
+
+    result = await run_in_threadpool(_handle_payload, payload)
+    return Response(content=dumps(result), media_type="application/json")
+
+
+def _handle_payload(payload: Any) -> dict:
     # tester / empty
     if payload is None or payload == {} or payload == []:
         return {"status": "success", "message": "Honeypot endpoint reachable"}
 
-    session_id, message, _metadata = _normalize_request_payload(payload)
+    turn = parse_turn_request(payload)
+    session_id, message = turn.session_id, turn.message
 
     if not session_id or not message:
         return {"status": "success", "message": "Invalid payload format"}
 
+    # size-capped text, with a separate prompt view if long
+    message, prompt_view = ingest_message(message)
+
+    # retries of the same turn get the original reply without re-running the turn
+    turn_key = make_turn_key(session_id, message, turn.timestamp)
+    return _TURN_CACHE.run_once(turn_key, lambda: _handle_turn(session_id, message, prompt_view))
+
+
+def _handle_turn(session_id: str, message: str, prompt_view: Optional[str] = None) -> dict:
+    # turns of one session run one at a time; other sessions stay parallel
+    with session_lock(session_id):
+        return _handle_turn_locked(session_id, message, prompt_view)
+
+
+def _handle_turn_locked(session_id: str, message: str, prompt_view: Optional[str] = None) -> dict:
     if is_session_finalized(session_id):
         return {"status": "success", "reply": "I am working on it. "}
 
     # 1) Store scammer message
-    add_message(session_id, "scammer", message)
+    add_message(session_id, "scammer", message, prompt_text=prompt_view)
+
+    priority = _is_near_finalization(session_id)
 
     # 2) Fast scam detection
-    if _detect_scam_fast(message):
+    verdict = _detect_scam_fast(message, priority=priority, prompt_view=prompt_view)
+    if verdict:
         mark_scam_detected(session_id)
 
     scam_detected = was_scam_detected(session_id)
+    if verdict is None and not scam_detected:
+        # detection shed under load: canned reply, session stays unclassified
+        add_message(session_id, "agent", REPLY_SHED)
+        return {"status": "success", "reply": REPLY_SHED}
 
-    history = []
     agent_reply = None
-    extracted_intelligence = {}
 
     if scam_detected:
         history = get_messages(session_id)
 
         # 3) Fast bounded reply generation (NO RAG)
-        agent_reply = _generate_reply_fast(history)
+        agent_reply = _generate_reply_fast(history, priority=priority)
         add_message(session_id, "agent", agent_reply)
 
-        # 4) Extract intelligence
-        extracted_intelligence = extract_intelligence(history)
-
-        # engagement_complete = (
-        #     scam_detected is True
-        #     and extracted_intelligence is not None
-        #     and get_message_count(session_id) >= 17
-        #     and any(
-        #         value
-        #         for key, value in extracted_intelligence.items()
-        #         if key != "suspiciousKeywords"
-        #     )
-        # )
-
-        intel_score = _calculate_intel_score(extracted_intelligence)
-        turns = get_message_count(session_id)
-
-        has_non_keyword_evidence = any(
-            value
-            for key, value in extracted_intelligence.items()
-            if key != "suspiciousKeywords"
-        )
-
-        engagement_complete = (
-                scam_detected is True
-                and extracted_intelligence is not None
-                and has_non_keyword_evidence
-                and (
-                        intel_score >= MIN_INTEL_SCORE
-                        or turns >= FALLBACK_MIN_TURNS
-                )
-        )
-
-        if engagement_complete and not is_session_finalized(session_id):
-            # agent_notes = generate_agent_notes(history)
-            agent_notes = _generate_notes_fast(history)
-            total_messages = get_message_count(session_id)
-            engagement_duration_seconds = _calculate_engagement_duration_seconds(history)
-            # async callback -> do not block API response
-            send_final_result_to_guvi_async(
-                session_id=session_id,
-                scam_detected=True,
-                total_messages=total_messages,
-                engagement_duration_seconds=engagement_duration_seconds,
-                extracted_intelligence=extracted_intelligence,
-                agent_notes=agent_notes
-            )
-
-            mark_session_finalized(session_id)
+        # 4) Extraction, scoring and finalization
+        if POST_TURN_MODE == "async":
+            # runs after the reply is returned; the next turn sees the finalized flag
+            _POST_TURN.submit(session_id, list(history))
+        elif _finalize_if_complete(session_id, history):
             return {
                 "status": "success",
                 "reply": "I am working on it. Please wait...!",
             }
 
     return {"status": "success", "reply": agent_reply or ""}
+
+
+def _finalize_if_complete(session_id: str, history: list, background_notes: bool = False) -> bool:
+    """
+    Extracts intelligence from history and, if the engagement is complete,
+    finalizes the session and dispatches the GUVI callback.
+    Returns True only for the call that finalized the session.
+    """
+    extracted_intelligence = extract_intelligence(history)
+
+    engagement_complete = _is_engagement_complete(extracted_intelligence, len(history))
+    if not engagement_complete or not try_finalize_session(session_id):
+        return False
+
+    if background_notes:
+        # keep the post-turn queue moving while notes are generated; the thread
+        # is already off the response path, so it sends the callback itself
+        thread = threading.Thread(
+            target=_send_final_result,
+            args=(session_id, history, extracted_intelligence, True),
+            daemon=True,
+        )
+        with _FINAL_RESULT_LOCK:
+            _FINAL_RESULT_THREADS.add(thread)
+        thread.start()
+    else:
+        _send_final_result(session_id, history, extracted_intelligence)
+    return True
+
+
+def _send_final_result(session_id: str, history: list, extracted_intelligence: dict, background: bool = False):
+    try:
+        agent_notes = _generate_notes_fast(history)
+        engagement_duration_seconds = _calculate_engagement_duration_seconds(history)
+        # in the request path: async callback -> do not block API response
+        send = send_final_result_to_guvi if background else send_final_result_to_guvi_async
+        send(
+            session_id=session_id,
+            scam_detected=True,
+            total_messages=len(history),
+            engagement_duration_seconds=engagement_duration_seconds,
+            extracted_intelligence=extracted_intelligence,
+            agent_notes=agent_notes
+        )
+    finally:
+        if background:
+            with _FINAL_RESULT_LOCK:
+                _FINAL_RESULT_THREADS.discard(threading.current_thread())
+
+
+def _drain_post_turn(timeout: float) -> bool:
+    """
+    Waits up to timeout seconds for queued post-turn jobs and the
+    background callbacks they started. Returns True when all finished.
+    """
+    deadline = time.monotonic() + timeout
+    if not _POST_TURN.join(timeout):
+        return False
+    with _FINAL_RESULT_LOCK:
+        pending = list(_FINAL_RESULT_THREADS)
+    for thread in pending:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    return not any(thread.is_alive() for thread in pending)
@@ -37,28 +37,52 @@
 
 # app/memory.py
 
+import os
+import threading
 from datetime import datetime
 
+from app.locks import session_lock
+from app.snapshot import SnapshotReader, encode_session, write_snapshot
+
 # In-memory session store
 _sessions = {}
 finalized_sessions = set()
+# short-lived guard for finalization only; session locks are held across model calls
+_finalize_lock = threading.Lock()
+# sessions restored from a snapshot but not yet touched stay here until first access
+_restored = None
 
 def get_session(session_id: str):
-    if session_id not in _sessions:
-        _sessions[session_id] = {
-            "messages": [],
-            "start_time": datetime.utcnow(),
-            "scam_detected": False
-        }
-    return _sessions[session_id]
-
-def add_message(session_id: str, sender: str, text: str):
+    session = _sessions.get(session_id)
+    if session is not None:
+        return session
+    with session_lock(session_id):
+        if session_id not in _sessions and _restored is not None and session_id in _restored:
+            try:
+                _sessions[session_id] = _restored.load(session_id)
+            except Exception as error:
+                # a damaged body only costs that session its history
+                print(f"[SNAPSHOT] could not decode session {session_id}: {error}")
+        if session_id not in _sessions:
+            _sessions[session_id] = {
+                "messages": [],
+                "start_time": datetime.utcnow(),
+                "scam_detected": False
+            }
+        return _sessions[session_id]
+
+def add_message(session_id: str, sender: str, text: str, prompt_text: str = None):
     session = get_session(session_id)
-    session["messages"].append({
+    message = {
         "sender": sender,
         "text": text,
         "timestamp": datetime.utcnow().isoformat()
-    })
+    }
+    # truncated view for model prompts, only kept when it differs from text
+    if prompt_text is not None:
+        message["prompt_text"] = prompt_text
+    with session_lock(session_id):
+        session["messages"].append(message)
 
 def get_messages(session_id: str):
     return get_session(session_id)["messages"]
@@ -78,3 +102,48 @@ def is_session_finalized(session_id: str) -> bool:
 
 def mark_session_finalized(session_id: str):
     finalized_sessions.add(session_id)
+
+def try_finalize_session(session_id: str) -> bool:
+    """
+    Atomic compare-and-set: marks the session finalized and returns True
+    only for the first caller, so a session is finalized exactly once.
+    """
+    with _finalize_lock:
+        if session_id in finalized_sessions:
+            return False
+        finalized_sessions.add(session_id)
+        return True
+
+def snapshot_sessions(path: str) -> dict:
+    """
+    Writes all live sessions (including restored ones never touched since)
+    and the finalized set to a binary snapshot at path.
+    """
+    def _blobs():
+        # encode_session copies and marshals under the GIL, so no per-session lock
+        for session_id, session in list(_sessions.items()):
+            yield session_id, encode_session(session)
+        if _restored is not None:
+            for session_id in list(_restored.index):
+                if session_id not in _sessions:
+                    yield session_id, _restored.raw(session_id)
+
+    with _finalize_lock:
+        finalized = list(finalized_sessions)
+    return write_snapshot(path, _blobs(), finalized)
+
+def restore_sessions(path: str) -> int:
+    """
+    Loads the snapshot index from path and renames the file to
+    path + ".consumed"; session bodies are decoded lazily on first access.
+    Returns the number of sessions available.
+    """
+    global _restored
+    reader = SnapshotReader(path)
+    # consume the file: after a crash the next start must not roll back to it again
+    # (the open mmap keeps the renamed file readable for lazy loads)
+    os.replace(path, f"{path}.consumed")
+    with _finalize_lock:
+        finalized_sessions.update(reader.finalized)
+    _restored = reader
+    return len(reader)
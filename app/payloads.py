@@ -0,0 +1,131 @@
+# app/payloads.py
+
+from typing import Any, NamedTuple, Optional
+
+from fastapi import HTTPException, Request
+
+
+async def read_body(request: Request, limit: int) -> bytes:
+    # refuse oversized bodies before reading / decoding them
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail="Request body too large")
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+class TurnRequest(NamedTuple):
+    session_id: Optional[str]
+    message: Optional[str]
+    metadata: dict
+    timestamp: Any = None
+
+
+_EMPTY = TurnRequest(None, None, {}, None)
+
+
+_MESSAGE_SCHEMA = {
+    "oneOf": [
+        {
+            "type": "object",
+            "properties": {"sender": {"type": "string"}, "text": {"type": "string"}, "timestamp": {}},
+        },
+        {"type": "string"},
+    ]
+}
+_LEGACY_SCHEMA = {
+    "type": "object",
+    "title": "LegacyTurn",
+    "properties": {"sessionId": {"type": "string"}, "message": _MESSAGE_SCHEMA, "metadata": {"type": "object"}},
+}
+_PANEL_SCHEMA = {
+    "type": "object",
+    "title": "PanelTurn",
+    "properties": {"scenarioId": {"type": "string"}, "initialMessage": _MESSAGE_SCHEMA, "metadata": {"type": "object"}},
+}
+
+# /honeypot reads the raw body, so the accepted formats are documented here for OpenAPI
+TURN_REQUEST_OPENAPI = {
+    "requestBody": {
+        "required": False,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "anyOf": [
+                        _LEGACY_SCHEMA,
+                        _PANEL_SCHEMA,
+                        {"type": "array", "items": {"anyOf": [_LEGACY_SCHEMA, _PANEL_SCHEMA]}},
+                    ]
+                }
+            }
+        },
+    }
+}
+
+
+def _text(value: Any) -> Optional[str]:
+    # only real strings are usable as session ids / message text
+    return value if isinstance(value, str) else None
+
+
+def _metadata(obj: dict) -> dict:
+    metadata = obj.get("metadata")
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def _parse_legacy(obj: dict) -> TurnRequest:
+    """
+    {"sessionId":"...","message":{"text":"...","timestamp":...},"metadata":{...}}
+    """
+    session_id = _text(obj.get("sessionId"))
+    msg = obj.get("message")
+    if isinstance(msg, dict):
+        return TurnRequest(session_id, _text(msg.get("text")), _metadata(obj), msg.get("timestamp"))
+    return TurnRequest(session_id, _text(msg), _metadata(obj), None)
+
+
+def _parse_panel(obj: dict) -> TurnRequest:
+    """
+    {"scenarioId":"...","initialMessage":"...","metadata":{...}}
+    """
+    session_id = _text(obj.get("scenarioId"))
+    message = obj.get("initialMessage")
+    if isinstance(message, dict):
+        return TurnRequest(session_id, _text(message.get("text")), _metadata(obj), message.get("timestamp"))
+    return TurnRequest(session_id, _text(message), _metadata(obj), None)
+
+
+def parse_turn_object(obj: dict) -> TurnRequest:
+    """
+    Dispatches on the first key, which is what both known clients send;
+    otherwise falls back to a key scan (sessionId wins over scenarioId).
+    """
+    first_key = next(iter(obj), None)
+    if first_key == "sessionId":
+        return _parse_legacy(obj)
+    if first_key == "scenarioId" and "sessionId" not in obj:
+        return _parse_panel(obj)
+
+    if "sessionId" in obj:
+        return _parse_legacy(obj)
+    if "scenarioId" in obj:
+        return _parse_panel(obj)
+    return TurnRequest(None, None, _metadata(obj), None)
+
+
+def parse_turn_request(payload: Any) -> TurnRequest:
+    # panel may send list of scenarios -> pick first valid
+    if isinstance(payload, dict):
+        return parse_turn_object(payload)
+    if isinstance(payload, list):
+        for item in payload:
+            if isinstance(item, dict):
+                turn = parse_turn_object(item)
+                if turn.session_id and turn.message:
+                    return turn
+    return _EMPTY
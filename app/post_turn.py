@@ -0,0 +1,93 @@
+# app/post_turn.py
+
+import queue
+import threading
+import time
+import zlib
+from typing import Callable, Optional
+
+
+class PostTurnPipeline:
+    """
+    Per-process worker queues for work that can run after the reply has
+    been returned (extraction, scoring, finalization, callback).
+
+    A session always hashes to the same worker, so its jobs run in the
+    order they were submitted; different sessions spread across workers.
+    """
+
+    def __init__(self, handler: Callable, workers: int = 2):
+        self._handler = handler
+        self._queues = [queue.Queue() for _ in range(max(1, workers))]
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._idle = threading.Condition(self._stats_lock)
+        self._unfinished = 0
+        self.submitted = 0
+        self.processed = 0
+        self.errors = 0
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for index, jobs in enumerate(self._queues):
+                thread = threading.Thread(
+                    target=self._worker, args=(jobs,), name=f"post-turn-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, session_id: str, *args):
+        self._ensure_started()
+        index = zlib.crc32(str(session_id).encode("utf-8")) % len(self._queues)
+        with self._stats_lock:
+            self.submitted += 1
+            self._unfinished += 1
+        self._queues[index].put((session_id, args))
+
+    def _worker(self, jobs: queue.Queue):
+        while True:
+            session_id, args = jobs.get()
+            try:
+                self._handler(session_id, *args)
+                with self._stats_lock:
+                    self.processed += 1
+            except Exception as error:
+                with self._stats_lock:
+                    self.errors += 1
+                print("Post-turn worker error:", str(error))
+            finally:
+                jobs.task_done()
+                with self._stats_lock:
+                    self._unfinished -= 1
+                    if not self._unfinished:
+                        self._idle.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until every submitted job has been processed, or until
+        timeout seconds have passed. Returns True when the queues drained.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._stats_lock:
+            while self._unfinished:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "workers": len(self._queues),
+                "queued": sum(jobs.qsize() for jobs in self._queues),
+                "unfinished": self._unfinished,
+                "submitted": self.submitted,
+                "processed": self.processed,
+                "errors": self.errors,
+            }
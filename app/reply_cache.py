@@ -0,0 +1,255 @@
+# app/reply_cache.py
+
+import hashlib
+import random
+import re
+import struct
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from app.fallbacks import FALLBACK_REPLIES
+
+# one salted blake2b digest yields 16 independent 32-bit hash lanes
+_LANES = struct.Struct("<16I")
+_LANES_PER_DIGEST = 16
+_MAX_HASH = (1 << 32) - 1
+
+# replies containing any of these would break the persona if reused
+_NON_PERSONA_TERMS = (
+    "as an ai", "language model", "chatbot", "honeypot", "scam", "fraud",
+    "detect", "security tool",
+)
+
+# matching ignores digits, so a cached reply must not carry numbers, handles
+# or links: they would belong to whichever session first produced it
+_ARTIFACT_PATTERN = re.compile(
+    r"\d|@|https?://|www\.|\b[\w-]+\.(?:com|in|net|org|co|info|xyz|link|app|online|site)\b",
+    re.IGNORECASE,
+)
+
+def _normalize(text: str) -> str:
+    text = (text or "").lower()
+    text = re.sub(r"\d+", "#", text)  # amounts, phone numbers, OTPs vary between copies
+    text = re.sub(r"[^\w#@.]+", " ", text)
+    return " ".join(text.split())
+
+
+def _shingles(text: str, k: int, max_chars: int) -> set:
+    # scripts diverge early, so the head of a message is enough to match on
+    normalized = _normalize(text)[:max_chars]
+    if not normalized:
+        return set()
+    if len(normalized) <= k:
+        return {normalized.encode("utf-8")}
+    return {normalized[i:i + k].encode("utf-8") for i in range(len(normalized) - k + 1)}
+
+
+def is_persona_compliant(reply: str) -> bool:
+    if not isinstance(reply, str):
+        return False
+    reply = reply.strip()
+    if not reply or len(reply) > 400 or reply in FALLBACK_REPLIES:
+        return False
+    if _ARTIFACT_PATTERN.search(reply):
+        return False
+    lowered = reply.lower()
+    return not any(term in lowered for term in _NON_PERSONA_TERMS)
+
+
+class _Entry:
+    __slots__ = ("signature", "context", "replies", "next_reply", "fills")
+
+    def __init__(self, signature: tuple, context: tuple, reply: str):
+        self.signature = signature
+        self.context = context
+        self.replies = [reply]
+        self.next_reply = 0
+        self.fills = 0  # matching lookups sent to the model to grow the pool
+
+
+class ReplyCache:
+    """
+    Near-duplicate reply reuse for templated scam scripts.
+
+    Each scammer turn is shingled and MinHashed; the preceding turn is kept
+    as a short MinHash fingerprint. Candidates come from an LSH index over
+    the turn signature and are accepted when the weighted similarity of
+    turn and context reaches `threshold`. Every entry keeps a small pool
+    of replies that is rotated so repeated hits do not echo one sentence.
+    Until that pool holds `pool_size` replies, matching lookups are sent to
+    the model instead (at most `max_fills` times per entry) so the pool
+    actually fills.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        threshold: float = 0.85,
+        num_perm: int = 64,
+        bands: int = 16,
+        context_perm: int = 8,
+        context_weight: float = 0.2,
+        pool_size: int = 3,
+        shingle_size: int = 5,
+        max_shingle_chars: int = 256,
+        max_fills: int = 6,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.context_weight = context_weight
+        self.pool_size = pool_size
+        self.shingle_size = shingle_size
+        self.max_shingle_chars = max_shingle_chars
+        self.max_fills = max_fills
+
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.context_perm = context_perm
+        self._salts = [
+            rng.getrandbits(128).to_bytes(16, "little")
+            for _ in range(-(-num_perm // _LANES_PER_DIGEST))
+        ]
+
+        self._entries = OrderedDict()  # entry id -> _Entry, in LRU order
+        self._buckets = {}  # (band, band hash) -> set of entry ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.fills = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _minhash(self, text: str, size: int) -> tuple:
+        shingles = _shingles(text, self.shingle_size, self.max_shingle_chars)
+        if not shingles:
+            return (_MAX_HASH,) * size
+        # hashing and the per-lane min run in C: one digest per shingle per 16 lanes
+        signature = []
+        for salt in self._salts[:-(-size // _LANES_PER_DIGEST)]:
+            digests = (
+                _LANES.unpack(hashlib.blake2b(shingle, digest_size=64, salt=salt).digest())
+                for shingle in shingles
+            )
+            signature.extend(map(min, zip(*digests)))
+        return tuple(signature[:size])
+
+    def _band_keys(self, signature: tuple) -> list:
+        return [
+            (band, hash(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def _agreement(left: tuple, right: tuple) -> float:
+        return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+    def _similarity(self, entry: _Entry, signature: tuple, context: tuple) -> float:
+        turn_sim = self._agreement(entry.signature, signature)
+        context_sim = self._agreement(entry.context, context)
+        return (1.0 - self.context_weight) * turn_sim + self.context_weight * context_sim
+
+    def _best_match(self, signature: tuple, context: tuple) -> Optional[int]:
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        best_id, best_sim = None, self.threshold
+        for entry_id in candidates:
+            sim = self._similarity(self._entries[entry_id], signature, context)
+            if sim >= best_sim:
+                best_id, best_sim = entry_id, sim
+        return best_id
+
+    def lookup(self, scammer_text: str, previous_text: str = "", exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        Returns a cached reply for a near-duplicate turn, skipping replies
+        in `exclude` (e.g. ones this session already received).
+        """
+        if self.max_entries <= 0:
+            return None
+        signature = self._minhash(scammer_text, self.num_perm)
+        context = self._minhash(previous_text, self.context_perm)
+        excluded = set(exclude)
+
+        with self._lock:
+            self.lookups += 1
+            entry_id = self._best_match(signature, context)
+            if entry_id is None:
+                return None
+            entry = self._entries[entry_id]
+            if len(entry.replies) < self.pool_size and entry.fills < self.max_fills:
+                # pool not full yet: let the model answer, store() adds the reply
+                entry.fills += 1
+                self.fills += 1
+                return None
+            for offset in range(len(entry.replies)):
+                index = (entry.next_reply + offset) % len(entry.replies)
+                reply = entry.replies[index]
+                if reply not in excluded:
+                    entry.next_reply = index + 1
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return reply
+            return None
+
+    def store(self, scammer_text: str, previous_text: str, reply: str) -> bool:
+        """
+        Records a freshly generated reply. Near-duplicate turns share one
+        entry whose reply pool grows up to `pool_size`.
+        """
+        if self.max_entries <= 0 or not is_persona_compliant(reply):
+            return False
+        reply = reply.strip()
+        signature = self._minhash(scammer_text, self.num_perm)
+        context = self._minhash(previous_text, self.context_perm)
+
+        with self._lock:
+            self.stores += 1
+            entry_id = self._best_match(signature, context)
+            if entry_id is not None:
+                entry = self._entries[entry_id]
+                if reply not in entry.replies and len(entry.replies) < self.pool_size:
+                    entry.replies.append(reply)
+                self._entries.move_to_end(entry_id)
+                return True
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(signature, context, reply)
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+            return True
+
+    def _evict_oldest(self):
+        entry_id, entry = self._entries.popitem(last=False)
+        for key in self._band_keys(entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+        self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hitRate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+                "poolFills": self.fills,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
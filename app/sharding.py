@@ -0,0 +1,168 @@
+# app/sharding.py
+
+import bisect
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+
+def _ring_hash(key: str) -> int:
+    # stable across processes and restarts, unlike hash() on str
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent-hash ring with virtual nodes. Removing a node only moves
+    the keys that node owned; every other key keeps its owner.
+    """
+
+    def __init__(self, nodes: Iterable[int] = (), vnodes: int = 64):
+        self.vnodes = vnodes
+        self._points = []  # sorted ring positions
+        self._owners = {}  # ring position -> node
+        self._nodes = set()
+        self._lock = threading.Lock()
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> set:
+        with self._lock:
+            return set(self._nodes)
+
+    def add(self, node: int):
+        with self._lock:
+            if node in self._nodes:
+                return
+            self._nodes.add(node)
+            for replica in range(self.vnodes):
+                point = _ring_hash(f"{node}#{replica}")
+                self._owners[point] = node
+                bisect.insort(self._points, point)
+
+    def remove(self, node: int):
+        with self._lock:
+            if node not in self._nodes:
+                return
+            self._nodes.discard(node)
+            for replica in range(self.vnodes):
+                point = _ring_hash(f"{node}#{replica}")
+                if self._owners.get(point) == node:
+                    del self._owners[point]
+                    index = bisect.bisect_left(self._points, point)
+                    if index < len(self._points) and self._points[index] == point:
+                        self._points.pop(index)
+
+    def node_for(self, key: str, exclude: Iterable[int] = ()) -> Optional[int]:
+        excluded = set(exclude)
+        with self._lock:
+            if not self._points:
+                return None
+            start = bisect.bisect(self._points, _ring_hash(key))
+            for offset in range(len(self._points)):
+                node = self._owners[self._points[(start + offset) % len(self._points)]]
+                if node not in excluded:
+                    return node
+        return None
+
+
+class ShardStats:
+    """
+    Per-shard request counters kept by the dispatcher.
+    """
+
+    def __init__(self, shard: int, port: int):
+        self.shard = shard
+        self.port = port
+        self.pid = None
+        self.up = False
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._latency_total = 0.0
+
+    def begin(self) -> float:
+        with self._lock:
+            self._requests += 1
+            self._in_flight += 1
+        return time.monotonic()
+
+    def end(self, started_at: float, ok: bool):
+        with self._lock:
+            self._in_flight -= 1
+            self._latency_total += time.monotonic() - started_at
+            if not ok:
+                self._errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "shard": self.shard,
+                "port": self.port,
+                "pid": self.pid,
+                "up": self.up,
+                "restarts": self.restarts,
+                "requests": self._requests,
+                "errors": self._errors,
+                "inFlight": self._in_flight,
+                "avgLatencyMs": round(self._latency_total / self._requests * 1000, 2) if self._requests else 0.0,
+            }
+
+
+class ShardRouter:
+    """
+    Maps session keys to shards.
+
+    `full` contains every configured shard and defines a key's home shard;
+    `live` only contains healthy shards. While a home shard is down its keys
+    go to the next live shard and are pinned there, so after the shard comes
+    back those sessions keep talking to the process that holds their state.
+    """
+
+    def __init__(self, shards: Iterable[int], vnodes: int = 64, max_pinned: int = 100000):
+        shards = list(shards)
+        self.full = HashRing(shards, vnodes)
+        self.live = HashRing((), vnodes)
+        self.max_pinned = max_pinned
+        self._pinned = OrderedDict()  # session key -> shard
+        self._lock = threading.Lock()
+
+    def route(self, key: str, exclude: Iterable[int] = ()) -> Optional[int]:
+        excluded = set(exclude)
+        live_nodes = self.live.nodes
+        with self._lock:
+            pinned = self._pinned.get(key)
+            if pinned is not None and pinned in live_nodes and pinned not in excluded:
+                self._pinned.move_to_end(key)
+                return pinned
+
+        home = self.full.node_for(key)
+        if home in live_nodes and home not in excluded:
+            return home
+
+        shard = self.live.node_for(key, exclude=excluded)
+        if shard is not None:
+            with self._lock:
+                self._pinned[key] = shard
+                self._pinned.move_to_end(key)
+                while len(self._pinned) > self.max_pinned:
+                    self._pinned.popitem(last=False)
+        return shard
+
+    def mark_down(self, shard: int):
+        self.live.remove(shard)
+
+    def mark_up(self, shard: int):
+        self.live.add(shard)
+
+    def pinned_counts(self) -> dict:
+        with self._lock:
+            counts = {}
+            for shard in self._pinned.values():
+                counts[shard] = counts.get(shard, 0) + 1
+            return counts
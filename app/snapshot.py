@@ -0,0 +1,130 @@
+# app/snapshot.py
+
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+# File layout:
+#   MAGIC
+#   session bodies: flag byte + marshal(session), zlib-compressed when large
+#   index: marshal({"sessions": {session_id: (offset, length)}, "finalized": [...]})
+#   footer: <Q index offset> MAGIC
+MAGIC = b"HPSNAP1\n"
+_FOOTER = struct.Struct("<Q")
+_FOOTER_SIZE = _FOOTER.size + len(MAGIC)
+
+# zlib setup cost dominates for short conversations, so only long ones are compressed
+_COMPRESS_MIN_BYTES = 2048
+_RAW = b"m"
+_ZLIB = b"z"
+
+
+def encode_session(session: dict) -> bytes:
+    body = dict(session)
+    start_time = body.get("start_time")
+    if isinstance(start_time, datetime):
+        body["start_time"] = start_time.isoformat()
+    data = marshal.dumps(body)
+    if len(data) >= _COMPRESS_MIN_BYTES:
+        return _ZLIB + zlib.compress(data, 1)
+    return _RAW + data
+
+
+def decode_session(blob: bytes) -> dict:
+    data = blob[1:]
+    if blob[:1] == _ZLIB:
+        data = zlib.decompress(data)
+    session = marshal.loads(data)
+    start_time = session.get("start_time")
+    if isinstance(start_time, str):
+        session["start_time"] = datetime.fromisoformat(start_time)
+    return session
+
+
+class SnapshotReader:
+    """
+    Lazily restores a snapshot: only the index is read up front, session
+    bodies are decoded on first access.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"empty snapshot file: {path}")
+
+        if self._map[:len(MAGIC)] != MAGIC or self._map[-len(MAGIC):] != MAGIC:
+            self.close()
+            raise ValueError(f"not a session snapshot: {path}")
+
+        (index_offset,) = _FOOTER.unpack_from(self._map, len(self._map) - _FOOTER_SIZE)
+        index = marshal.loads(self._map[index_offset:len(self._map) - _FOOTER_SIZE])
+        self.index = index["sessions"]
+        self.finalized = set(index["finalized"])
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def raw(self, session_id: str) -> Optional[bytes]:
+        entry = self.index.get(session_id)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._map[offset:offset + length]
+
+    def load(self, session_id: str) -> Optional[dict]:
+        blob = self.raw(session_id)
+        return decode_session(blob) if blob is not None else None
+
+    def close(self):
+        try:
+            self._map.close()
+        finally:
+            self._file.close()
+
+
+def write_snapshot(path: str, blobs: Iterable[Tuple[str, bytes]], finalized: Iterable[str]) -> dict:
+    """
+    Writes (session_id, encoded body) pairs and the finalized set to path.
+    The file is written next to path and renamed into place, so a crash
+    mid-write never leaves a truncated snapshot behind.
+    """
+    # unique temp name: several instances may share one snapshot directory
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path) or "."
+    )
+    index = {}
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(MAGIC)
+            offset = len(MAGIC)
+            for session_id, blob in blobs:
+                handle.write(blob)
+                index[session_id] = (offset, len(blob))
+                offset += len(blob)
+
+            handle.write(marshal.dumps({"sessions": index, "finalized": list(finalized)}))
+            handle.write(_FOOTER.pack(offset))
+            handle.write(MAGIC)
+            handle.flush()
+            os.fsync(handle.fileno())
+            size = handle.tell()
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return {"sessions": len(index), "bytes": size}
@@ -0,0 +1,94 @@
+"""
+Benchmark micro-batched detection against one model call per message.
+
+Uses benchmarks.fake_model.FakeModel, which charges a fixed per-call
+overhead, so batching shows up as fewer calls and lower latency under bursts.
+
+Run from the repo root:
+    python -m benchmarks.bench_detect_batching --messages 64 --batch 8 --wait-ms 5
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import detector
+from app.detect_batcher import DetectionBatcher
+from benchmarks.fake_model import FakeModel
+
+_SAMPLES = [
+    "URGENT: Your SBI account is blocked. Share OTP to unblock.",
+    "Hi, are we still meeting for lunch tomorrow?",
+    "Congratulations! You won a prize. Verify your UPI to claim.",
+    "Your parcel is out for delivery today.",
+]
+
+
+def _burst(messages: int) -> list:
+    return [f"{_SAMPLES[i % len(_SAMPLES)]} #{i}" for i in range(messages)]
+
+
+def _summarize(name: str, latencies: list, elapsed: float, model: FakeModel, verdicts: list) -> dict:
+    return {
+        "mode": name,
+        "model_calls": model.calls,
+        "wall_s": round(elapsed, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+        "scams": sum(1 for v in verdicts if v.get("scamDetected")),
+    }
+
+
+def _run_unbatched(texts: list, workers: int, model: FakeModel) -> dict:
+    pool = ThreadPoolExecutor(max_workers=workers)
+    start = time.perf_counter()
+    submitted = [(time.perf_counter(), pool.submit(detector.detect_scam, text)) for text in texts]
+    verdicts, latencies = [], []
+    for t0, future in submitted:
+        verdicts.append(future.result())
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return _summarize("per-message", latencies, elapsed, model, verdicts)
+
+
+def _run_batched(texts: list, workers: int, batch: int, wait_ms: float, model: FakeModel) -> dict:
+    pool = ThreadPoolExecutor(max_workers=workers)
+    batcher = DetectionBatcher(detector.detect_scam_batch, max_batch=batch, max_wait_ms=wait_ms, dispatch=pool.submit)
+    start = time.perf_counter()
+    submitted = [(time.perf_counter(), batcher.submit(text)) for text in texts]
+    verdicts, latencies = [], []
+    for t0, future in submitted:
+        verdicts.append(future.result())
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    result = _summarize(f"batched(max={batch},wait={wait_ms}ms)", latencies, elapsed, model, verdicts)
+    result["avg_batch"] = batcher.stats()["avgBatchSize"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    parser.add_argument("--overhead-ms", type=float, default=200.0)
+    parser.add_argument("--per-item-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    texts = _burst(args.messages)
+
+    model = FakeModel(args.overhead_ms, args.per_item_ms)
+    detector.get_model = lambda: model
+    print(_run_unbatched(texts, args.workers, model))
+
+    model = FakeModel(args.overhead_ms, args.per_item_ms)
+    detector.get_model = lambda: model
+    print(_run_batched(texts, args.workers, args.batch, args.wait_ms, model))
+
+
+if __name__ == "__main__":
+    main()
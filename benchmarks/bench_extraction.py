@@ -0,0 +1,144 @@
+"""
+Fuzz and worst-case benchmark for bounded-cost extraction.
+
+1) Fuzz: random texts built from artifact fragments and separators are run
+   through chunked_findall with tiny windows (forcing artifacts onto window
+   edges) and compared with a single pattern.findall over the whole text.
+2) Worst case: adversarial inputs (e.g. "a.a.a.a...", which made the old
+   unbounded UPI pattern quadratic) are extracted at doubling sizes; the time
+   per doubling must stay close to 2x, i.e. linear growth.
+
+Run from the repo root:
+    python -m benchmarks.bench_extraction --max-kb 1024
+"""
+
+import argparse
+import random
+import re
+import time
+
+from app import extractor
+from app.extractor import chunked_findall, extract_intelligence
+
+_PATTERNS = {
+    "upi": extractor.UPI_PATTERN,
+    "phone": extractor.PHONE_PATTERN,
+    "url": extractor.URL_PATTERN,
+    "email": extractor.EMAIL_PATTERN,
+    "ifsc": extractor.IFSC_PATTERN,
+    "pan": extractor.PAN_PATTERN,
+    "account": extractor.ACCOUNT_PATTERN,
+}
+
+_FRAGMENTS = [
+    "sbi.verify@okaxis", "refund.desk@ybl", "support@sbi-help.com", "9876543210", "+91 9123456789",
+    "https://sbi-kyc.example.com/login?id=42", "SBIN0001234", "ABCDE1234F", "account: 123456789012",
+    "a/c 50100234567890", "OTP", "urgent", "a.b-c", "@@", "...", "http://", "0", "91",
+]
+_SEPARATORS = [" ", "", "\n", ".", "-", ", ", "  ", ":"]
+
+_ADVERSARIAL = {
+    "dotted-word": "a.",
+    "dashed-word": "a-",
+    "at-chain": "a@",
+    "url-chain": "http://x",
+    "digits": "9",
+    "account-spaces": "account ",
+    "upper-run": "ABCDE",
+}
+
+# the pre-change UPI pattern, kept here only to show the quadratic baseline
+_LEGACY_UPI = re.compile(r"\b[\w.-]+@[\w.-]+\b")
+
+
+def fuzz(rounds: int, seed: int) -> int:
+    rng = random.Random(seed)
+    checked = 0
+    for _ in range(rounds):
+        parts = []
+        for _ in range(rng.randint(1, 400)):
+            parts.append(rng.choice(_FRAGMENTS))
+            parts.append(rng.choice(_SEPARATORS))
+        text = "".join(parts)
+        chunk = rng.randint(1, 64)
+        for name, pattern in _PATTERNS.items():
+            expected = pattern.findall(text)
+            got = chunked_findall(pattern, text, chunk_size=chunk, overlap=extractor.CHUNK_OVERLAP)
+            assert got == expected, f"{name}: chunked scan differs (chunk={chunk})"
+            checked += 1
+
+    # artifacts placed exactly across every window edge must survive
+    sentence = "pay to sbi.verify@okaxis, call 9876543210, open https://x.example.com/a account 123456789 "
+    expected = extract_intelligence([{"text": sentence}])
+    for offset in range(-60, 61):
+        filler = "x" * (extractor.CHUNK_SIZE + offset - 1) + " "
+        result = extract_intelligence([{"text": filler + sentence + filler}])
+        assert result == expected, f"artifact lost at window edge (offset={offset})"
+        checked += 1
+    return checked
+
+
+def _time(fn) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def worst_case(max_kb: int, max_growth: float) -> list:
+    rows = []
+    for name, unit in _ADVERSARIAL.items():
+        size_kb = 16
+        previous = None
+        while size_kb <= max_kb:
+            text = (unit * (size_kb * 1024 // len(unit) + 1))[: size_kb * 1024]
+            elapsed = _time(lambda: extract_intelligence([{"text": text}]))
+            growth = elapsed / previous if previous else None
+            rows.append({
+                "input": name,
+                "kb": size_kb,
+                "ms": round(elapsed * 1000, 2),
+                "us_per_kb": round(elapsed * 1e6 / size_kb, 1),
+                "growth": round(growth, 2) if growth else None,
+            })
+            if growth is not None and size_kb >= 64:
+                assert growth < max_growth, f"{name}: {size_kb}KB took {growth:.2f}x the previous size"
+            previous = elapsed
+            size_kb *= 2
+    return rows
+
+
+def legacy_baseline(max_kb: int) -> list:
+    rows = []
+    size_kb = 4
+    while size_kb <= max_kb:
+        text = ("a." * (size_kb * 512 + 1))[: size_kb * 1024]
+        rows.append({
+            "legacy_upi_kb": size_kb,
+            "ms": round(_time(lambda: _LEGACY_UPI.findall(text)) * 1000, 2),
+            "bounded_ms": round(_time(lambda: chunked_findall(extractor.UPI_PATTERN, text)) * 1000, 2),
+        })
+        size_kb *= 2
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fuzz-rounds", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-kb", type=int, default=1024)
+    parser.add_argument("--max-growth", type=float, default=3.0, help="allowed time ratio per size doubling")
+    parser.add_argument("--legacy-max-kb", type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"fuzz: {fuzz(args.fuzz_rounds, args.seed)} checks passed")
+    for row in worst_case(args.max_kb, args.max_growth):
+        print(row)
+    for row in legacy_baseline(args.legacy_max_kb):
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+End-to-end turn latency benchmark for the /honeypot handler.
+
+Drives complete scam conversations through the /honeypot handler with
+benchmarks.fake_model.FakeModel standing in for Gemini and the GUVI callback
+stubbed out, and compares the post-turn modes on the same turn indices:
+    inline   extraction/scoring/finalization before the reply is returned
+    async    the same work on the post-turn pipeline after the reply
+
+Every conversation sends the same script for the same number of turns in both
+modes. The finalizing turn (the first one whose history meets the
+finalization criteria, found from the inline run) is reported separately from
+the turns before it; later turns are not counted, since inline mode already
+answers them with the finalized reply.
+
+Run from the repo root:
+    python -m benchmarks.bench_honeypot --sessions 50 --overhead-ms 20
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import agent, agent_notes, detector, guvi_callback
+from app import main as honeypot_app
+from benchmarks.fake_model import FakeModel
+
+_FINALIZED_REPLY = "I am working on it. Please wait"
+
+_SCRIPT = [
+    "Dear customer, your SBI account is blocked. Share OTP to unblock.",
+    "Sir this is urgent, call our officer on 9876543210 immediately.",
+    "Transfer Rs 1 to sbi.verify@okaxis, account 123456789012 IFSC SBIN0001234.",
+    "Or open https://sbi-kyc-update.example.com/login and complete KYC.",
+    "Also pay the fee to refund.desk@ybl, helpline 9123456789.",
+    "Send PAN ABCDE1234F to support@sbi-help.com for verification.",
+]
+
+
+def _install_fakes(model: FakeModel):
+    for module in (detector, agent, agent_notes):
+        module.get_model = lambda: model
+    guvi_callback.send_final_result_to_guvi = lambda **kwargs: 200
+    honeypot_app.send_final_result_to_guvi = guvi_callback.send_final_result_to_guvi
+    honeypot_app._REPLY_CACHE.max_entries = 0  # measure the model path, not reply reuse
+
+
+def _conversation(session_id: str, turns: int) -> list:
+    results = []
+    for index in range(turns):
+        payload = {
+            "sessionId": session_id,
+            "message": {"text": f"{_SCRIPT[index % len(_SCRIPT)]} ({index})", "timestamp": index},
+        }
+        start = time.perf_counter()
+        response = honeypot_app._handle_payload(payload)
+        results.append((time.perf_counter() - start, response.get("reply", "")))
+    return results
+
+
+def _latency_stats(latencies: list) -> dict:
+    latencies = sorted(ms * 1000 for ms in latencies)
+    if not latencies:
+        return {"n": 0}
+    return {
+        "n": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+def _run(mode: str, sessions: int, turns: int, concurrency: int) -> tuple:
+    honeypot_app.POST_TURN_MODE = mode
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: _conversation(f"{mode}-{i}", turns), range(sessions)))
+    honeypot_app._POST_TURN.join()
+    elapsed = time.perf_counter() - start
+    finalized = sum(1 for i in range(sessions) if honeypot_app.is_session_finalized(f"{mode}-{i}"))
+    return results, elapsed, finalized
+
+
+def _finalizing_turn(inline_results: list) -> int:
+    indices = {
+        next(index for index, (_, reply) in enumerate(turns) if reply.startswith(_FINALIZED_REPLY))
+        for turns in inline_results
+        if any(reply.startswith(_FINALIZED_REPLY) for _, reply in turns)
+    }
+    if len(indices) != 1:
+        raise SystemExit(f"conversations finalized on different turns: {sorted(indices)}")
+    return indices.pop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--overhead-ms", type=float, default=20.0)
+    parser.add_argument("--min-intel-score", type=int, default=12)
+    args = parser.parse_args()
+
+    _install_fakes(FakeModel(args.overhead_ms, 0.0))
+    honeypot_app.MIN_INTEL_SCORE = args.min_intel_score
+
+    runs = {mode: _run(mode, args.sessions, args.turns, args.concurrency) for mode in ("inline", "async")}
+    final_index = _finalizing_turn(runs["inline"][0])
+    print(f"finalizing turn index: {final_index}")
+    for mode, (results, elapsed, finalized) in runs.items():
+        print({
+            "mode": mode,
+            "wall_s": round(elapsed, 3),
+            "finalized": finalized,
+            "before_final": _latency_stats([turns[i][0] for turns in results for i in range(final_index)]),
+            "final_turn": _latency_stats([turns[final_index][0] for turns in results]),
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Per-request parse / encode cost of the /honeypot fast path.
+
+Compares, in microseconds per operation:
+- request decode + typed parse: stdlib json vs app.codec.loads (orjson when installed)
+- response encode: FastAPI's default (jsonable_encoder + JSONResponse rendering) vs app.codec.dumps
+- GUVI callback body encode: requests' json= (json.dumps) vs app.codec.dumps
+
+Run from the repo root:
+    python -m benchmarks.bench_payloads --number 20000
+"""
+
+import argparse
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+
+from app import codec
+from app.codec import intelligence_block
+from app.payloads import parse_turn_request
+
+_LEGACY = {
+    "sessionId": "demo-session-1",
+    "message": {
+        "sender": "scammer",
+        "text": "Your account will be blocked. Share OTP now.",
+        "timestamp": 1770005528731,
+    },
+    "metadata": {"channel": "SMS", "language": "English", "locale": "IN"},
+}
+_PANEL = {
+    "scenarioId": "bank_fraud",
+    "initialMessage": "URGENT: Your SBI account has been compromised...",
+    "metadata": {"channel": "SMS", "language": "English", "locale": "IN"},
+}
+_PANEL_LIST = [_PANEL, {**_PANEL, "scenarioId": "upi_fraud"}]
+
+_REPLY = {"status": "success", "reply": "Which branch are you calling from? Please share the official helpline."}
+_INTEL = {
+    "bankAccounts": ["123456789012"],
+    "upiIds": ["sbi.verify@okaxis"],
+    "phishingLinks": ["https://sbi-kyc-update.example.com/login"],
+    "phoneNumbers": ["9876543210", "+91 9123456789"],
+    "emailAddresses": ["support@sbi-help.com"],
+    "ifscCodes": ["SBIN0001234"],
+    "panNumbers": ["ABCDE1234F"],
+    "suspiciousKeywords": ["otp", "blocked", "urgent", "verify", "kyc"],
+}
+_CALLBACK = {
+    "sessionId": "demo-session-1",
+    "scamDetected": True,
+    "totalMessagesExchanged": 18,
+    "engagementDurationSeconds": 240,
+    "extractedIntelligence": intelligence_block(_INTEL, include_keywords=True),
+    "agentNotes": "Scammer impersonated SBI and pushed for OTP and UPI payment.",
+}
+
+
+def _fastapi_default_render(obj) -> bytes:
+    # what FastAPI does for a returned dict: jsonable_encoder, then JSONResponse.render
+    return json.dumps(
+        jsonable_encoder(obj), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _us(fn, number: int) -> float:
+    return round(min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.number
+
+    print(f"encoder: {'orjson' if codec.orjson is not None else 'stdlib json'}")
+    for name, payload in (("legacy", _LEGACY), ("panel", _PANEL), ("panel-list", _PANEL_LIST)):
+        body = json.dumps(payload).encode("utf-8")
+        print({
+            "parse": name,
+            "stdlib_us": _us(lambda: parse_turn_request(json.loads(body)), n),
+            "fast_us": _us(lambda: parse_turn_request(codec.loads(body)), n),
+        })
+
+    for name, obj in (("reply", _REPLY), ("callback", _CALLBACK)):
+        print({
+            "encode": name,
+            "fastapi_default_us": _us(lambda: _fastapi_default_render(obj), n),
+            "json_dumps_us": _us(lambda: json.dumps(obj).encode("utf-8"), n),
+            "fast_us": _us(lambda: codec.dumps(obj), n),
+        })
+
+
+if __name__ == "__main__":
+    main()
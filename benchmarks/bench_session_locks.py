@@ -0,0 +1,147 @@
+"""
+Concurrency stress benchmark for per-session locking.
+
+Drives the real /honeypot handler (app.main._handle_payload, inline post-turn
+mode) with benchmarks.fake_model.FakeModel standing in for Gemini. Every
+session gets all of its turns submitted at once, interleaved across sessions,
+and each mode swaps only the lock app.main takes around a turn:
+    none       no turn lock (shows what the lock protects against)
+    session    app.locks.session_lock
+    colliding  session_lock, with every session id hashing to the same stripe
+    global     one lock for every session
+
+Checks, for the session modes:
+- every session is finalized and its GUVI callback is sent exactly once
+- the history of every session alternates scammer/agent (no interleaving)
+- sessions sharing a stripe run as fast as sessions that do not, and far
+  faster than under a single global lock
+
+Run from the repo root:
+    python -m benchmarks.bench_session_locks
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from app import agent, agent_notes, detector, locks, memory
+from app import main as honeypot_app
+from app.admission import AdmissionController
+from benchmarks.fake_model import FakeModel
+
+_SCRIPT = [
+    "Your SBI account is blocked, call 9876543210 and share OTP.",
+    "Sir urgent, our officer number is 9123456789, verify now.",
+    "Transfer Rs 1 to account 123456789012 to unblock, helpline 9012345678.",
+    "Last warning, KYC pending, call 9988776655 immediately.",
+]
+
+
+def _install_fakes(model: FakeModel, workers: int, finalize_at: int, callbacks: dict):
+    for module in (detector, agent, agent_notes):
+        module.get_model = lambda: model
+    guard = threading.Lock()
+
+    def _count_callback(session_id, **kwargs):
+        with guard:
+            callbacks[session_id] = callbacks.get(session_id, 0) + 1
+
+    honeypot_app.send_final_result_to_guvi_async = _count_callback
+    honeypot_app.POST_TURN_MODE = "inline"
+    honeypot_app.MIN_INTEL_SCORE = 10 ** 6  # finalize on turn count only
+    honeypot_app.FALLBACK_MIN_TURNS = finalize_at
+    honeypot_app._REPLY_CACHE.max_entries = 0
+    honeypot_app._DETECT_BATCHER = None
+    # room for every model call so the pool never becomes the bottleneck
+    honeypot_app._ADMISSION = AdmissionController(
+        ThreadPoolExecutor(max_workers=workers), max_pending=10 ** 6, max_running=workers
+    )
+
+
+def _colliding_ids(count: int) -> list:
+    ids, candidate = [], 0
+    while len(ids) < count:
+        session_id = f"colliding-{candidate}"
+        if locks.SESSION_LOCKS.stripe_for(session_id) == 0:
+            ids.append(session_id)
+        candidate += 1
+    return ids
+
+
+def _run(mode: str, sessions: int, turns: int, workers: int, callbacks: dict) -> dict:
+    memory._sessions.clear()
+    memory.finalized_sessions.clear()
+    callbacks.clear()
+    global_lock = threading.RLock()
+    lock_for = {
+        "none": lambda session_id: nullcontext(),
+        "session": locks.session_lock,
+        "colliding": locks.session_lock,
+        "global": lambda session_id: global_lock,
+    }[mode]
+    honeypot_app.session_lock = lock_for
+
+    session_ids = _colliding_ids(sessions) if mode == "colliding" else [f"{mode}-{s}" for s in range(sessions)]
+    jobs = [
+        {"sessionId": session_id, "message": {"text": _SCRIPT[t % len(_SCRIPT)], "timestamp": t}}
+        for t in range(turns)
+        for session_id in session_ids
+    ]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(honeypot_app._handle_payload, jobs))
+    elapsed = time.perf_counter() - start
+
+    interleaved = 0
+    for session_id in session_ids:
+        senders = [m["sender"] for m in memory.get_messages(session_id)]
+        if senders[0::2] != ["scammer"] * len(senders[0::2]) or senders[1::2] != ["agent"] * len(senders[1::2]):
+            interleaved += 1
+
+    return {
+        "mode": mode,
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(len(jobs) / elapsed, 1),
+        "finalized": sum(1 for session_id in session_ids if memory.is_session_finalized(session_id)),
+        "callbacks": sum(callbacks.values()),
+        "double_callbacks": sum(1 for c in callbacks.values() if c > 1),
+        "interleaved_sessions": interleaved,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=128)
+    parser.add_argument("--model-ms", type=float, default=20.0)
+    parser.add_argument("--finalize-at", type=int, default=8, help="history length that finalizes a session")
+    args = parser.parse_args()
+
+    callbacks = {}
+    _install_fakes(FakeModel(args.model_ms, 0.0), args.workers, args.finalize_at, callbacks)
+    try:
+        results = {
+            mode: _run(mode, args.sessions, args.turns, args.workers, callbacks)
+            for mode in ("none", "session", "colliding", "global")
+        }
+    finally:
+        honeypot_app.session_lock = locks.session_lock
+    for r in results.values():
+        print(r)
+
+    for mode in ("session", "colliding"):
+        r = results[mode]
+        assert r["double_callbacks"] == 0, f"{mode}: session finalized more than once"
+        assert r["interleaved_sessions"] == 0, f"{mode}: turns of one session interleaved"
+        assert r["finalized"] == args.sessions == r["callbacks"], f"{mode}: not every session was finalized once"
+    ratio = results["colliding"]["turns_per_s"] / results["session"]["turns_per_s"]
+    print(f"colliding/session throughput ratio: {ratio:.2f}")
+    assert ratio > 0.7, "sessions sharing a stripe were serialized"
+    assert results["colliding"]["turns_per_s"] > 2 * results["global"]["turns_per_s"], "no gain over a global lock"
+
+
+if __name__ == "__main__":
+    main()
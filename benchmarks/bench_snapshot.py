@@ -0,0 +1,105 @@
+"""
+Benchmark session snapshot and lazy restore.
+
+For each session count, fills app.memory with synthetic conversations and
+measures:
+- snapshot write time and file size
+- restore time (index only, what delays readiness)
+- first-access time per session (lazy body decode)
+- time to materialize every session
+
+Run from the repo root:
+    python -m benchmarks.bench_snapshot --sizes 10000,100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from app import memory
+
+_TURNS = [
+    ("scammer", "URGENT: Your SBI account is blocked. Share OTP to unblock."),
+    ("agent", "Oh no, which branch are you calling from?"),
+    ("scammer", "Call 9876543210 and pay to sbi.verify@okaxis now."),
+    ("agent", "What is the official helpline number?"),
+]
+
+
+def _fill(count: int, messages: int):
+    memory._sessions.clear()
+    memory.finalized_sessions.clear()
+    memory._restored = None
+    now = datetime.utcnow()
+    stamp = now.isoformat()
+    for index in range(count):
+        session_id = f"session-{index}"
+        memory._sessions[session_id] = {
+            "messages": [
+                {"sender": sender, "text": f"{text} #{index}", "timestamp": stamp}
+                for sender, text in (_TURNS * (messages // len(_TURNS) + 1))[:messages]
+            ],
+            "start_time": now,
+            "scam_detected": True,
+        }
+        if index % 10 == 0:
+            memory.finalized_sessions.add(session_id)
+
+
+def _bench(count: int, messages: int, path: str) -> dict:
+    _fill(count, messages)
+
+    start = time.perf_counter()
+    written = memory.snapshot_sessions(path)
+    snapshot_s = time.perf_counter() - start
+
+    memory._sessions.clear()
+    memory.finalized_sessions.clear()
+
+    start = time.perf_counter()
+    restored = memory.restore_sessions(path)
+    restore_s = time.perf_counter() - start
+    assert restored == count
+
+    probe = [f"session-{i}" for i in range(0, count, max(1, count // 1000))]
+    start = time.perf_counter()
+    for session_id in probe:
+        memory.get_session(session_id)
+    first_access_us = (time.perf_counter() - start) / len(probe) * 1e6
+
+    start = time.perf_counter()
+    for index in range(count):
+        memory.get_session(f"session-{index}")
+    materialize_s = time.perf_counter() - start
+
+    assert memory.get_message_count("session-1") == messages
+    assert memory.is_session_finalized("session-0")
+    memory._restored.close()
+    memory._restored = None
+
+    return {
+        "sessions": count,
+        "snapshot_s": round(snapshot_s, 3),
+        "file_mb": round(written["bytes"] / 1e6, 2),
+        "restore_index_s": round(restore_s, 4),
+        "first_access_us": round(first_access_us, 1),
+        "materialize_all_s": round(materialize_s, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--messages", type=int, default=8, help="messages per session")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.snap")
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            print(_bench(size, args.messages, path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Offline detection quality-versus-latency evaluation.
+
+Replays a labeled corpus of conversations through each detection tier and
+the hybrid finalization rule, for every combination of:
+- hint set (SCAM_HINTS variants used by the fast pre-check)
+- detect_scam confidence threshold
+- MIN_INTEL_SCORE / FALLBACK_MIN_TURNS
+
+Tiers:
+    hints              fast keyword pre-check only, no model calls
+    llm                recorded model verdict for every turn
+    hints+llm          current pipeline: pre-check, model only on a miss
+    hints+llm+sticky   as above, but skip detection once the session is flagged
+
+Model verdicts come from recorded responses in the corpus and go through the
+real detect_scam parsing, so the confidence threshold is applied exactly as in
+production. Configurations are evaluated in parallel across CPU cores.
+
+Corpus format (one JSON object per line, see benchmarks/data/detection_corpus.jsonl):
+    {"id": "...", "label": true,
+     "turns": [{"text": "...", "llmResponse": "<raw model text>", "llmLatencyMs": 900}, ...],
+     "agentReplies": ["...", ...]}
+
+Run from the repo root:
+    python -m benchmarks.eval_detection --thresholds 0.5,0.6,0.7 --min-intel-scores 7,27
+"""
+
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "detection_corpus.jsonl")
+TIERS = ("hints", "llm", "hints+llm", "hints+llm+sticky")
+
+# generic words that fire on a lot of legitimate banking traffic
+_GENERIC_HINTS = {"bank", "account", "link", "verify", "upi"}
+
+_CORPUS = []
+_OPTIONS = {}
+
+
+class _RecordedResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _RecordedModel:
+    def __init__(self, text):
+        self._text = text
+
+    def generate_content(self, prompt):
+        if self._text is None:
+            raise RuntimeError("no recorded response")
+        return _RecordedResponse(self._text)
+
+
+def _hint_sets() -> dict:
+    from app.main import SCAM_HINTS
+
+    return {
+        "default": set(SCAM_HINTS),
+        "strict": set(SCAM_HINTS) - _GENERIC_HINTS,
+    }
+
+
+def _load_corpus(path: str) -> list:
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _init_worker(corpus_path: str, options: dict):
+    global _CORPUS, _OPTIONS
+    _CORPUS = _load_corpus(corpus_path)
+    _OPTIONS = options
+
+
+def _llm_verdict(turn: dict) -> bool:
+    from app import detector
+
+    detector.get_model = lambda: _RecordedModel(turn.get("llmResponse"))
+    return bool(detector.detect_scam(turn["text"]).get("scamDetected"))
+
+
+def _replay(conversation: dict, tier: str, hints: set, min_intel_score: int, fallback_min_turns: int) -> dict:
+    from app import main
+    from app.extractor import extract_intelligence
+
+    hint_cost_ms = _OPTIONS["hint_cost_ms"]
+    default_llm_ms = _OPTIONS["llm_latency_ms"]
+    replies = conversation.get("agentReplies") or []
+    clock = datetime(2026, 1, 1)
+
+    detected = False
+    model_calls = 0
+    latency_ms = 0.0
+    history = []
+    finalized_at = None
+    turns_seen = 0
+
+    for index, turn in enumerate(conversation["turns"]):
+        turns_seen += 1
+        clock += timedelta(seconds=30)
+        history.append({"sender": "scammer", "text": turn["text"], "timestamp": clock.isoformat()})
+
+        skip = tier == "hints+llm+sticky" and detected
+        hit = False
+        if not skip:
+            if tier != "llm":
+                latency_ms += hint_cost_ms
+                hit = any(k in turn["text"].lower() for k in hints)
+            if not hit and tier != "hints":
+                model_calls += 1
+                latency_ms += float(turn.get("llmLatencyMs", default_llm_ms))
+                hit = _llm_verdict(turn)
+        detected = detected or hit
+
+        if detected:
+            reply = replies[index] if index < len(replies) else "Please share the official number."
+            clock += timedelta(seconds=10)
+            history.append({"sender": "agent", "text": reply, "timestamp": clock.isoformat()})
+            if main._is_engagement_complete(
+                extract_intelligence(history), len(history), min_intel_score, fallback_min_turns
+            ):
+                finalized_at = index + 1
+                break
+
+    return {
+        "predicted": detected,
+        "model_calls": model_calls,
+        "latency_ms": latency_ms,
+        "turns": turns_seen,
+        "finalized_at": finalized_at,
+    }
+
+
+def _evaluate(config: tuple) -> dict:
+    tier, hint_name, threshold, min_intel_score, fallback_min_turns = config
+    from app import detector
+
+    detector.CONFIDENCE_THRESHOLD = threshold
+    hints = _hint_sets()[hint_name]
+
+    tp = fp = fn = tn = 0
+    model_calls = 0
+    turns = 0
+    latency_ms = 0.0
+    finalize_turns = []
+    for conversation in _CORPUS:
+        outcome = _replay(conversation, tier, hints, min_intel_score, fallback_min_turns)
+        label = bool(conversation["label"])
+        if outcome["predicted"] and label:
+            tp += 1
+        elif outcome["predicted"]:
+            fp += 1
+        elif label:
+            fn += 1
+        else:
+            tn += 1
+        model_calls += outcome["model_calls"]
+        turns += outcome["turns"]
+        latency_ms += outcome["latency_ms"]
+        if label and outcome["finalized_at"] is not None:
+            finalize_turns.append(outcome["finalized_at"])
+
+    scams = tp + fn
+    return {
+        "tier": tier,
+        "hints": hint_name,
+        "threshold": threshold,
+        "minIntelScore": min_intel_score,
+        "fallbackMinTurns": fallback_min_turns,
+        "precision": round(tp / (tp + fp), 3) if tp + fp else 0.0,
+        "recall": round(tp / scams, 3) if scams else 0.0,
+        "modelCalls": model_calls,
+        "modelCallsAvoided": turns - model_calls,
+        "finalizedRate": round(len(finalize_turns) / scams, 3) if scams else 0.0,
+        "avgTurnsToFinalize": round(sum(finalize_turns) / len(finalize_turns), 2) if finalize_turns else None,
+        "avgDetectLatencyMs": round(latency_ms / turns, 1) if turns else 0.0,
+    }
+
+
+def _csv(value: str, cast):
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--tiers", default=",".join(TIERS))
+    parser.add_argument("--hint-sets", default="default,strict")
+    parser.add_argument("--thresholds", default="0.5,0.6,0.7,0.8")
+    parser.add_argument("--min-intel-scores", default="7,12,27")
+    parser.add_argument("--fallback-min-turns", default="6,10,19")
+    parser.add_argument("--llm-latency-ms", type=float, default=1200.0, help="used when a turn has no llmLatencyMs")
+    parser.add_argument("--hint-cost-ms", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--json", help="also write all results to this file")
+    args = parser.parse_args()
+
+    configs = list(itertools.product(
+        _csv(args.tiers, str),
+        _csv(args.hint_sets, str),
+        _csv(args.thresholds, float),
+        _csv(args.min_intel_scores, int),
+        _csv(args.fallback_min_turns, int),
+    ))
+    options = {"llm_latency_ms": args.llm_latency_ms, "hint_cost_ms": args.hint_cost_ms}
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(args.corpus, options),
+    ) as pool:
+        results = list(pool.map(_evaluate, configs, chunksize=max(1, len(configs) // (4 * (args.workers or 1)))))
+
+    columns = [
+        "tier", "hints", "threshold", "minIntelScore", "fallbackMinTurns", "precision", "recall",
+        "modelCalls", "modelCallsAvoided", "finalizedRate", "avgTurnsToFinalize", "avgDetectLatencyMs",
+    ]
+    print("\t".join(columns))
+    for row in results:
+        print("\t".join(str(row[c]) for c in columns))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
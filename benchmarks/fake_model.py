@@ -0,0 +1,63 @@
+"""
+Deterministic stand-in for the Gemini model used by the benchmarks.
+
+Answers detection prompts (single and batched) with a keyword heuristic and
+reply/notes prompts with a fixed sentence, after sleeping for a fixed
+per-call overhead plus a small per-message cost.
+"""
+
+import json
+import re
+import threading
+import time
+
+_SCAM_WORDS = ("otp", "blocked", "upi", "kyc", "verify", "urgent", "account", "link", "prize")
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _verdict(message: str, index=None) -> dict:
+    lowered = message.lower()
+    hits = sum(1 for word in _SCAM_WORDS if word in lowered)
+    verdict = {
+        "scamDetected": hits > 0,
+        "confidence": min(1.0, 0.5 + 0.2 * hits),
+        "reason": f"{hits} scam indicators",
+    }
+    if index is not None:
+        verdict = {"index": index, **verdict}
+    return verdict
+
+
+class FakeModel:
+    def __init__(self, call_overhead_ms: float = 200.0, per_item_ms: float = 5.0):
+        self.call_overhead_ms = call_overhead_ms
+        self.per_item_ms = per_item_ms
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _sleep(self, items: int):
+        time.sleep((self.call_overhead_ms + self.per_item_ms * items) / 1000.0)
+
+    def generate_content(self, prompt: str) -> _Response:
+        with self._lock:
+            self.calls += 1
+
+        if "Classify each numbered message" in prompt:
+            block = prompt.split("Messages:", 1)[1].split("Respond ONLY", 1)[0]
+            items = re.findall(r"^\[(\d+)\] (.*)$", block, re.MULTILINE)
+            self._sleep(len(items))
+            return _Response(json.dumps([_verdict(json.loads(text), int(index)) for index, text in items]))
+
+        if "scam detection classifier" in prompt:
+            message = prompt.split("Message:", 1)[1].split("Respond ONLY", 1)[0]
+            self._sleep(1)
+            return _Response(json.dumps(_verdict(message)))
+
+        self._sleep(1)
+        if "single-sentence summary" in prompt:
+            return _Response("Scammer impersonated a bank and pushed for an OTP.")
+        return _Response("Which branch are you calling from? Please share the official number.")